@@ -14,9 +14,14 @@
 
 import search
 import random
+from patternDatabase import AdditivePatternHeuristic, rankPermutation
+from slidingPuzzle import getSlidingPuzzle
 
 # Module Classes
 
+# the packed 3 x 3 puzzle behind every EightPuzzleState
+_puzzle = getSlidingPuzzle(3)
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -46,18 +51,22 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is packed into one int, 'state'
+        (see slidingPuzzle.py), from which 'cells', a 2-dimensional list
+        (a list of lists), is derived when asked for.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        if sorted(numbers) != list(range(9)):
+            raise Exception('An eight puzzle needs the numbers 0 to 8')
+        self.state = _puzzle.pack(numbers)
+
+    @property
+    def cells( self ):
+        tiles = self.getTiles()
+        return [tiles[0:3], tiles[3:6], tiles[6:9]]
+
+    @property
+    def blankLocation( self ):
+        return divmod(_puzzle.blank(self.state), 3)
 
     def isGoal( self ):
         """
@@ -77,13 +86,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.state == _puzzle.goal
 
     def legalMoves( self ):
         """
@@ -95,17 +98,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return [entry[0] for entry in _puzzle.moves[_puzzle.blank(self.state)]]
 
     def result(self, move):
         """
@@ -113,36 +106,15 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
+        if move not in _puzzle.moveTo[_puzzle.blank(self.state)]:
+            raise Exception("Illegal Move")
+        newPuzzle = EightPuzzleState.__new__(EightPuzzleState)
+        newPuzzle.state = _puzzle.result(self.state, move)
         return newPuzzle
 
     # Utilities for comparison and display
@@ -155,13 +127,29 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return self.state == other.state
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.state)
+
+    def getTiles( self ):
+        """
+          Returns the numbers of the puzzle row by row, 0 for the blank.
+
+        >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).getTiles()
+        [1, 0, 2, 3, 4, 5, 6, 7, 8]
+        """
+        return _puzzle.unpack(self.state)
+
+    def rank( self ):
+        """
+          Returns the permutation rank of the puzzle, a number from 0 to
+        9! - 1 that is different for every configuration.
+
+        >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).rank()
+        0
+        """
+        return rankPermutation(self.getTiles(), 9)
 
     def __getAsciiString(self):
         """
@@ -196,7 +184,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -221,6 +209,24 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+    def getTiles(self, state):
+        "Returns the numbers of a state row by row, for pattern database heuristics."
+        return state.getTiles()
+
+_patternHeuristic = None
+
+def eightPuzzleHeuristic(state, problem):
+    """
+      An admissible and consistent heuristic for EightPuzzleSearchProblem:
+    the sum of two additive pattern databases, one for tiles 1-4 and one for
+    tiles 5-8 (see patternDatabase.py).  The databases are built on first
+    use and memory-mapped from disk afterwards.
+    """
+    global _patternHeuristic
+    if _patternHeuristic == None:
+        _patternHeuristic = AdditivePatternHeuristic(3)
+    return _patternHeuristic(state, problem)
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -268,8 +274,8 @@ if __name__ == '__main__':
     print(puzzle)
 
     problem = EightPuzzleSearchProblem(puzzle)
-    path = search.breadthFirstSearch(problem)
-    print('BFS found a path of %d moves: %s' % (len(path), str(path)))
+    path = search.aStarSearch(problem, eightPuzzleHeuristic)
+    print('A* found a path of %d moves: %s' % (len(path), str(path)))
     curr = puzzle
     i = 1
     for a in path:
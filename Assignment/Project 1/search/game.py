@@ -190,6 +190,8 @@ class Grid:
 
     def __eq__(self, other):
         if other == None: return False
+        if isinstance(other, BitGrid): return other == self
+        if not isinstance(other, Grid): return False
         return self.data == other.data
 
     def __hash__(self):
@@ -280,6 +282,131 @@ def reconstituteGrid(bitRep):
     width, height = bitRep[:2]
     return Grid(width, height, bitRepresentation= bitRep[2:])
 
+class BitGrid:
+    """
+    A drop-in alternative to Grid that stores every cell as one bit of a
+    single Python int.  Cell (x,y) is bit x * height + y, the same numbering
+    Grid uses for packBits and __hash__, so equal grids hash alike in both
+    representations.
+
+    Since the int is immutable, copy() is O(1): writes through grid[x][y]
+    replace the int instead of modifying it.  count() is a popcount, the hash
+    is cached until the next write, and asList() only visits the set bits.
+    """
+    def __init__(self, width, height, initialValue=False, bits=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.width = width
+        self.height = height
+        self._mask = (1 << (width * height)) - 1
+        if bits is None:
+            bits = self._mask if initialValue else 0
+        self.bits = bits
+        self._hash = None
+
+    def __getitem__(self, x):
+        if x < 0: x += self.width
+        if not 0 <= x < self.width: raise IndexError('BitGrid column out of range')
+        return BitGridColumn(self, x)
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, Grid): other = toBitGrid(other)
+        if not isinstance(other, BitGrid): return False
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def get(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def set(self, x, y, value):
+        bit = 1 << (x * self.height + y)
+        if value:
+            self.bits |= bit
+        else:
+            self.bits &= ~bit
+        self._hash = None
+
+    def copy(self):
+        g = BitGrid(self.width, self.height, bits=self.bits)
+        g._hash = self._hash
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        ones = bin(self.bits).count('1')
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key = True):
+        bits = self.bits if key else self._mask & ~self.bits
+        list = []
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            list.append( (index // self.height, index % self.height) )
+            bits ^= low
+        return list
+
+    def packBits(self):
+        return toGrid(self).packBits()
+
+class BitGridColumn:
+    "One column of a BitGrid, so that grid[x][y] reads and writes the bitboard."
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+
+    def __getitem__(self, y):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('BitGrid row out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('BitGrid row out of range')
+        grid = self.grid
+        if value:
+            grid.bits |= 1 << (self.offset + y)
+        else:
+            grid.bits &= ~(1 << (self.offset + y))
+        grid._hash = None
+
+    def __len__(self):
+        return self.grid.height
+
+def toBitGrid(grid):
+    "Converts a Grid (or a packed bit representation of one) to a BitGrid."
+    if isinstance(grid, BitGrid):
+        return grid.copy()
+    grid = reconstituteGrid(grid)
+    bits = 0
+    for x, y in grid.asList():
+        bits |= 1 << (x * grid.height + y)
+    return BitGrid(grid.width, grid.height, bits=bits)
+
+def toGrid(bitGrid):
+    "Converts a BitGrid back to a list-of-lists Grid."
+    g = Grid(bitGrid.width, bitGrid.height)
+    for x, y in bitGrid.asList():
+        g[x][y] = True
+    return g
+
 ####################################
 # Parts you shouldn't have to read #
 ####################################
@@ -329,6 +456,31 @@ class Actions:
         return (dx * speed, dy * speed)
     directionToVector = staticmethod(directionToVector)
 
+    def getNeighborTable(walls):
+        """
+        Returns a dict mapping every open cell of walls to a tuple of
+        (neighbor, action) pairs, one per legal move other than STOP, in the
+        order of Actions._directionsAsList.  Walls never change during a game,
+        so the table is built once and kept on the wall Grid, which the
+        Layout owns.
+        """
+        table = getattr(walls, 'neighborTable', None)
+        if table is None:
+            moves = [(dir, vec) for dir, vec in Actions._directionsAsList if dir != Directions.STOP]
+            table = {}
+            for x in range(walls.width):
+                for y in range(walls.height):
+                    if walls[x][y]: continue
+                    neighbors = []
+                    for dir, (dx, dy) in moves:
+                        next_x, next_y = x + dx, y + dy
+                        if not (0 <= next_x < walls.width and 0 <= next_y < walls.height): continue
+                        if not walls[next_x][next_y]: neighbors.append(((next_x, next_y), dir))
+                    table[(x, y)] = tuple(neighbors)
+            walls.neighborTable = table
+        return table
+    getNeighborTable = staticmethod(getNeighborTable)
+
     def getPossibleActions(config, walls):
         possible = []
         x, y = config.pos
@@ -338,6 +490,10 @@ class Actions:
         if (abs(x - x_int) + abs(y - y_int)  > Actions.TOLERANCE):
             return [config.getDirection()]
 
+        moves = Actions.getNeighborTable(walls).get((x_int, y_int))
+        if moves is not None:
+            return [dir for _, dir in moves] + [Directions.STOP]
+
         for dir, vec in Actions._directionsAsList:
             dx, dy = vec
             next_y = y_int + dy
@@ -351,6 +507,10 @@ class Actions:
     def getLegalNeighbors(position, walls):
         x,y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
+        moves = Actions.getNeighborTable(walls).get((x_int, y_int))
+        if moves is not None:
+            return [neighbor for neighbor, _ in moves] + [(x_int, y_int)]
+
         neighbors = []
         for dir, vec in Actions._directionsAsList:
             dx, dy = vec
@@ -488,7 +648,7 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        self.food = toBitGrid(layout.food)
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
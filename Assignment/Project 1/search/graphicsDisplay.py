@@ -79,6 +79,9 @@ CAPSULE_SIZE = 0.25
 # Drawing walls
 WALL_RADIUS = 0.15
 
+# Expanded cells drawn while a search runs: the color is halfway faded after this many
+EXPANDED_CELLS_FADE = 200.0
+
 class InfoPane:
     def __init__(self, layout, gridSize):
         self.gridSize = gridSize
@@ -580,10 +583,30 @@ class PacmanGraphics:
             if self.frameTime < 0:
                 refresh()
 
+    def addExpandedCells(self, cells):
+        """
+        Adds a batch of newly expanded grid positions to the overlay while a
+        search runs (see searchEvents.py).  Cells fade as more are expanded,
+        since the total is not known yet.
+        """
+        if 'expandedCells' not in dir(self):
+            self.expandedCells = []
+        baseColor = [1.0, 0.0, 0.0]
+        for cell in cells:
+            k = len(self.expandedCells)
+            cellColor = formatColor(*[c * .5 / (1 + k / EXPANDED_CELLS_FADE) + .25 for c in baseColor])
+            block = square(self.to_screen(cell),
+                     0.5 * self.gridSize,
+                     color = cellColor,
+                     filled = 1, behind=2)
+            self.expandedCells.append(block)
+        refresh()
+
     def clearExpandedCells(self):
         if 'expandedCells' in dir(self) and len(self.expandedCells) > 0:
             for cell in self.expandedCells:
                 remove_from_screen(cell)
+            self.expandedCells = []
 
 
     def updateDistributions(self, distributions):
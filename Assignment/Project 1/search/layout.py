@@ -14,6 +14,8 @@
 
 from util import manhattanDistance
 from game import Grid
+from game import Actions
+from layoutGraph import getLayoutGraph
 import os
 import random
 from functools import reduce
@@ -62,6 +64,20 @@ class Layout:
         else:
             self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
 
+    def getNeighborTable(self):
+        """
+        Maps each open cell to a tuple of (neighbor, action) pairs for its
+        legal moves.  Built once per layout; see Actions.getNeighborTable.
+        """
+        return Actions.getNeighborTable(self.walls)
+
+    def getLayoutGraph(self):
+        """
+        The corridor graph of the layout, with its junctions, dead ends and
+        food as nodes.  Built once per layout; see layoutGraph.py.
+        """
+        return getLayoutGraph(self)
+
     def isWall(self, pos):
         x, col = pos
         return self.walls[x][col]
@@ -0,0 +1,254 @@
+# layoutGraph.py
+# --------------
+
+
+"""
+The corridor graph of a layout, for hierarchical (HPA*-style) search.
+
+The nodes of the graph are the junctions (cells with three or more open
+neighbors), the dead ends and the food cells of the layout; a loop with none
+of those gets one of its cells as a node.  Every other open cell lies inside
+exactly one corridor, a chain of cells with two open neighbors each, and the
+corridors are the edges of the graph, weighted by their length.  A query
+between two cells links each of them to the ends of its corridor, searches
+the graph, and only then expands the corridors on the way into cells.
+
+The graph is built once per Layout and kept on it:
+
+  graph = getLayoutGraph(gameState.data.layout)
+  graph.distance((1, 1), (20, 9))
+
+Steps are assumed to cost 1, as in every layout-based search problem here.
+"""
+
+import heapq
+import itertools
+
+from game import Actions
+
+
+class Corridor:
+    """
+    A chain of open cells between two graph nodes.  cells runs from
+    ends[0] to ends[1], both included, so its length is len(cells) - 1.
+    The two ends are the same node for a loop.
+    """
+
+    def __init__(self, cells):
+        self.cells = tuple(cells)
+        self.ends = (self.cells[0], self.cells[-1])
+        self.length = len(self.cells) - 1
+
+    def between(self, start, end):
+        "The cells from offset start to offset end, both included, in that order."
+        if start <= end:
+            return list(self.cells[start:end + 1])
+        return list(self.cells[end:start + 1][::-1])
+
+    def __repr__(self):
+        return 'Corridor(%s -> %s, %d)' % (self.ends[0], self.ends[1], self.length)
+
+
+class LayoutGraph:
+    """
+    The corridor graph of a wall grid, with the cells of food (a Grid, or
+    None) as extra nodes.
+
+      nodes:      the set of node cells
+      edges:      node -> list of (neighbor node, Corridor)
+      corridorOf: cell inside a corridor -> (Corridor, offset of the cell)
+    """
+
+    def __init__(self, walls, food=None):
+        self.neighbors = Actions.getNeighborTable(walls)
+        self.nodes = set()
+        for cell, moves in self.neighbors.items():
+            if len(moves) != 2 or (food != None and food[cell[0]][cell[1]]):
+                self.nodes.add(cell)
+        self.edges = dict((node, []) for node in self.nodes)
+        self.corridorOf = {}
+        for node in sorted(self.nodes):
+            self._addCorridors(node)
+        # loops without a junction, dead end or food cell
+        for cell in sorted(self.neighbors):
+            if cell not in self.nodes and cell not in self.corridorOf:
+                self.nodes.add(cell)
+                self.edges[cell] = []
+                self._addCorridors(cell)
+
+    def _addCorridors(self, node):
+        "Walks every corridor leaving node that has not been walked from its other end."
+        for cell, _ in self.neighbors[node]:
+            if cell in self.corridorOf:
+                continue
+            if cell in self.nodes and cell <= node and cell != node:
+                # a corridor of length 1, already added from the other node
+                continue
+            cells = [node]
+            previous = node
+            while cell not in self.nodes:
+                cells.append(cell)
+                (first, _), (second, _) = self.neighbors[cell]
+                previous, cell = cell, (second if first == previous else first)
+            cells.append(cell)
+            corridor = Corridor(cells)
+            for offset in range(1, corridor.length):
+                self.corridorOf[cells[offset]] = (corridor, offset)
+            self.edges[node].append((cell, corridor))
+            if cell != node:
+                self.edges[cell].append((node, corridor))
+
+    def isNode(self, cell):
+        return cell in self.nodes
+
+    def _links(self, cell):
+        "Returns (node, distance, cells from cell to node) for the nodes next to an open cell."
+        if cell in self.nodes:
+            return [(cell, 0, [cell])]
+        corridor, offset = self.corridorOf[cell]
+        first, last = corridor.ends
+        if first == last:
+            # a loop: leave by the shorter side
+            if offset <= corridor.length - offset:
+                return [(first, offset, corridor.between(offset, 0))]
+            return [(last, corridor.length - offset, corridor.between(offset, corridor.length))]
+        return [(first, offset, corridor.between(offset, 0)),
+                (last, corridor.length - offset, corridor.between(offset, corridor.length))]
+
+    def attachments(self, cell):
+        """
+        The nodes an open cell reaches without passing another node, with
+        their distances: the cell itself if it is a node, otherwise the ends
+        of its corridor.
+        """
+        return [(node, distance) for node, distance, _ in self._links(cell)]
+
+    def _direct(self, start, goal):
+        "The distance between two cells inside the same corridor, or None."
+        if start in self.corridorOf and goal in self.corridorOf:
+            corridor, startOffset = self.corridorOf[start]
+            other, goalOffset = self.corridorOf[goal]
+            if corridor is other:
+                return abs(startOffset - goalOffset), corridor.between(startOffset, goalOffset)
+        return None
+
+    def search(self, start, goal, estimate=None):
+        """
+        A* over the graph from cell start to cell goal.  estimate(cell) must
+        be a consistent lower bound on the distance from a node to goal; it
+        defaults to the Manhattan distance.
+
+        Returns (cost, cells, expanded): the cells of a shortest path from
+        start to goal (both included) and the number of nodes expanded.  cost
+        and cells are None if goal cannot be reached.
+        """
+        if estimate == None:
+            estimate = lambda cell: abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+        goalLinks = {}
+        for node, distance, cells in self._links(goal):
+            goalLinks[node] = (distance, cells[::-1])
+
+        counter = itertools.count()
+        # (f, tiebreak, cost, node, parent) where parent is (node, Corridor) or
+        # the cells from start; node None stands for goal
+        frontier = []
+        direct = self._direct(start, goal)
+        if direct != None:
+            frontier.append((direct[0], next(counter), direct[0], None, direct[1]))
+        costs = {}
+        for node, distance, cells in self._links(start):
+            costs[node] = distance
+            heapq.heappush(frontier, (distance + estimate(node), next(counter), distance, node, cells))
+
+        parents = {}
+        expanded = 0
+        while frontier:
+            _, _, cost, node, parent = heapq.heappop(frontier)
+            if node == None:
+                return cost, self._path(parents, parent), expanded
+            if node in parents:
+                continue
+            parents[node] = parent
+            expanded += 1
+            if node in goalLinks:
+                distance, cells = goalLinks[node]
+                heapq.heappush(frontier, (cost + distance, next(counter), cost + distance, None, (node, cells)))
+            for neighbor, corridor in self.edges[node]:
+                nextCost = cost + corridor.length
+                if neighbor in parents or nextCost >= costs.get(neighbor, float('inf')):
+                    continue
+                costs[neighbor] = nextCost
+                heapq.heappush(frontier, (nextCost + estimate(neighbor), next(counter), nextCost, neighbor, (node, corridor)))
+        return None, None, expanded
+
+    def _path(self, parents, last):
+        "Rebuilds the cells of a path from the parent of the goal."
+        if isinstance(last, list):
+            return last
+        node, cells = last
+        segments = [cells[1:]]
+        parent = parents[node]
+        while isinstance(parent, tuple):
+            previous, corridor = parent
+            cells = list(corridor.cells) if corridor.ends[0] == previous else list(corridor.cells[::-1])
+            segments.append(cells[1:])
+            node, parent = previous, parents[previous]
+        segments.append(parent)
+        path = []
+        for segment in reversed(segments):
+            path += segment
+        return path
+
+    def getPath(self, start, goal):
+        "The cells of a shortest path from start to goal, or None."
+        return self.search(start, goal)[1]
+
+    def distance(self, start, goal):
+        "The maze distance from start to goal, inf if there is no path."
+        cost = self.search(start, goal)[0]
+        return float('inf') if cost == None else cost
+
+    def distancesFrom(self, source):
+        """
+        Runs Dijkstra's algorithm over the graph from a cell and returns a
+        table of the distances to every reachable node, and to the cells
+        of source's own corridor.  Read it with tableDistance.
+        """
+        table = {}
+        frontier = [(distance, node) for node, distance in self.attachments(source)]
+        heapq.heapify(frontier)
+        while frontier:
+            cost, node = heapq.heappop(frontier)
+            if node in table:
+                continue
+            table[node] = cost
+            for neighbor, corridor in self.edges[node]:
+                if neighbor not in table:
+                    heapq.heappush(frontier, (cost + corridor.length, neighbor))
+        if source not in self.nodes:
+            corridor, sourceOffset = self.corridorOf[source]
+            inf = float('inf')
+            first, last = [table.get(end, inf) for end in corridor.ends]
+            for offset in range(1, corridor.length):
+                table[corridor.cells[offset]] = min(abs(offset - sourceOffset), offset + first,
+                                                    corridor.length - offset + last)
+        return table
+
+    def tableDistance(self, table, cell):
+        "The distance from the source of a distancesFrom table to an open cell."
+        if cell in table:
+            return table[cell]
+        inf = float('inf')
+        return min([table.get(node, inf) + distance for node, distance in self.attachments(cell)])
+
+
+def getLayoutGraph(layout):
+    """
+    The LayoutGraph of a Layout, with its food as nodes.  Built on first use
+    and kept on the layout.
+    """
+    graph = getattr(layout, 'layoutGraph', None)
+    if graph is None:
+        graph = LayoutGraph(layout.walls, layout.food)
+        layout.layoutGraph = graph
+    return graph
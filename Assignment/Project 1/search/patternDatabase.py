@@ -0,0 +1,289 @@
+# patternDatabase.py
+# ------------------
+
+
+"""
+Additive pattern databases for sliding tile puzzles such as the eight
+puzzle (side 3) and the fifteen puzzle (side 4).
+
+A puzzle with side s has n = s * s cells numbered row by row, and its goal
+has the blank in cell 0 and tile t in cell t.  A pattern is a tuple of tiles;
+its database holds, for every placement of those tiles, the least number of
+moves of pattern tiles needed to bring them home, found by a backward
+breadth-first search from the goal.  Since only moves of the pattern's own
+tiles are counted, the values of disjoint patterns can be added up and the
+sum is still an admissible and consistent heuristic.
+
+Placements are stored by their permutation rank in one flat byte array,
+which is written to PATTERN_DATABASE_DIR and memory-mapped by later runs.
+To build the default databases ahead of time:
+
+> python patternDatabase.py -s 4
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from collections import deque
+from optparse import OptionParser
+
+PATTERN_DATABASE_DIR = os.environ.get('PACMAN_PATTERN_DATABASES',
+                                      os.path.join(tempfile.gettempdir(), 'pacman-patterns'))
+
+# disjoint patterns used when no partition is given
+DEFAULT_PARTITIONS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15)],
+}
+
+UNKNOWN = 255
+
+
+def permutationCount(n, k):
+    "The number of sequences of k distinct values drawn from range(n)."
+    count = 1
+    for i in range(k):
+        count *= n - i
+    return count
+
+
+def rankPermutation(values, n):
+    """
+    The lexicographic rank of a sequence of distinct values drawn from
+    range(n) among all sequences of its length, a number below
+    permutationCount(n, len(values)).  For a full permutation this is its
+    Lehmer code.
+
+    >>> rankPermutation([0, 1, 2], 3), rankPermutation([2, 1, 0], 3)
+    (0, 5)
+    """
+    rank = 0
+    used = 0
+    for i, value in enumerate(values):
+        smaller = bin(used & ((1 << value) - 1)).count('1')
+        rank = rank * (n - i) + value - smaller
+        used |= 1 << value
+    return rank
+
+
+def unrankPermutation(rank, k, n):
+    """
+    The inverse of rankPermutation: the sequence of k distinct values from
+    range(n) with the given rank.
+
+    >>> unrankPermutation(rankPermutation([3, 0, 2], 4), 3, 4)
+    [3, 0, 2]
+    """
+    digits = []
+    for i in range(k - 1, -1, -1):
+        rank, digit = divmod(rank, n - i)
+        digits.append(digit)
+    digits.reverse()
+    unused = list(range(n))
+    return [unused.pop(digit) for digit in digits]
+
+
+def puzzleNeighbors(side):
+    "For every cell of a puzzle, the cells the blank can move to from there."
+    neighbors = []
+    for cell in range(side * side):
+        row, col = divmod(cell, side)
+        adjacent = []
+        if row > 0: adjacent.append(cell - side)
+        if row < side - 1: adjacent.append(cell + side)
+        if col > 0: adjacent.append(cell - 1)
+        if col < side - 1: adjacent.append(cell + 1)
+        neighbors.append(adjacent)
+    return neighbors
+
+
+def buildPatternTable(side, pattern):
+    """
+    Builds the database of one pattern by a breadth-first search backwards
+    from the goal over the placements of the pattern tiles and the blank.
+    Moving a pattern tile costs 1 and moving any other tile costs 0, so the
+    search keeps a double-ended queue and puts free moves at its front.
+    Returns an array('B') indexed by the rank of the pattern tiles' cells.
+    """
+    n = side * side
+    k = len(pattern)
+    neighbors = puzzleNeighbors(side)
+    table = array('B', [UNKNOWN]) * permutationCount(n, k)
+    # distances of (pattern tile cells..., blank cell) placements
+    distances = array('B', [UNKNOWN]) * permutationCount(n, k + 1)
+
+    start = tuple(pattern) + (0,)
+    distances[rankPermutation(start, n)] = 0
+    table[rankPermutation(start[:-1], n)] = 0
+    queue = deque([(start, 0)])
+    while queue:
+        placement, distance = queue.popleft()
+        if distance > distances[rankPermutation(placement, n)]:
+            continue
+        tiles, blank = placement[:-1], placement[-1]
+        for cell in neighbors[blank]:
+            if cell in tiles:
+                # the pattern tile in cell slides into the blank
+                i = tiles.index(cell)
+                moved = tiles[:i] + (blank,) + tiles[i + 1:]
+                nextPlacement, nextDistance = moved + (cell,), distance + 1
+            else:
+                moved = tiles
+                nextPlacement, nextDistance = tiles + (cell,), distance
+            rank = rankPermutation(nextPlacement, n)
+            if nextDistance >= distances[rank]:
+                continue
+            distances[rank] = nextDistance
+            if nextDistance == distance:
+                queue.appendleft((nextPlacement, nextDistance))
+            else:
+                queue.append((nextPlacement, nextDistance))
+                tilesRank = rankPermutation(moved, n)
+                if nextDistance < table[tilesRank]:
+                    table[tilesRank] = nextDistance
+    return table
+
+
+class PatternDatabase:
+    """
+    The database of one pattern.  table may be an existing table for the
+    same puzzle and pattern, such as one memory-mapped from disk.
+    """
+
+    def __init__(self, side, pattern, table=None):
+        self.side = side
+        self.cells = side * side
+        self.pattern = tuple(pattern)
+        if table is None:
+            table = buildPatternTable(side, self.pattern)
+        self.table = table
+
+    def lookup(self, positions):
+        """
+        The least number of pattern tile moves to the goal, where
+        positions[t] is the cell of tile t.
+        """
+        return self.table[rankPermutation([positions[tile] for tile in self.pattern], self.cells)]
+
+
+def patternDatabasePath(side, pattern):
+    return os.path.join(PATTERN_DATABASE_DIR,
+                        '%dx%d-%s.pdb' % (side, side, '-'.join([str(tile) for tile in pattern])))
+
+
+def loadPatternDatabase(side, pattern):
+    """
+    Memory-maps the saved database of a pattern.  Returns None if there is
+    no usable file.
+    """
+    size = permutationCount(side * side, len(pattern))
+    try:
+        with open(patternDatabasePath(side, pattern), 'rb') as f:
+            if os.fstat(f.fileno()).st_size != size:
+                return None
+            # the mapping stays valid after the file is closed
+            table = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError):
+        return None
+    return PatternDatabase(side, pattern, table)
+
+
+def savePatternDatabase(database):
+    """
+    Writes a database to PATTERN_DATABASE_DIR.  The file is renamed into
+    place once complete, so concurrent readers never see a partial table.
+    Failing to write it is not an error.
+    """
+    path = patternDatabasePath(database.side, database.pattern)
+    if os.path.exists(path):
+        return
+    tmpPath = None
+    try:
+        os.makedirs(PATTERN_DATABASE_DIR, exist_ok=True)
+        fd, tmpPath = tempfile.mkstemp(dir=PATTERN_DATABASE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(database.table.tobytes())
+        os.chmod(tmpPath, 0o644)
+        os.replace(tmpPath, path)
+    except OSError:
+        # do not leave partial tables behind
+        if tmpPath is not None and os.path.exists(tmpPath):
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+
+
+_databases = {}
+
+def getPatternDatabase(side, pattern):
+    """
+    The database of a pattern: kept in memory once used, otherwise loaded
+    from disk, otherwise built and saved.
+    """
+    key = (side, tuple(pattern))
+    if key not in _databases:
+        database = loadPatternDatabase(side, pattern)
+        if database is None:
+            database = PatternDatabase(side, pattern)
+            savePatternDatabase(database)
+        _databases[key] = database
+    return _databases[key]
+
+
+class AdditivePatternHeuristic:
+    """
+    The sum of the databases of disjoint patterns, usable as a heuristic for
+    a puzzle search problem.  The tiles of a state are read with
+    problem.getTiles(state), a sequence giving the tile in each cell with 0
+    for the blank.
+    """
+
+    def __init__(self, side, partition=None):
+        self.side = side
+        self.cells = side * side
+        if partition is None:
+            partition = DEFAULT_PARTITIONS[side]
+        self.databases = [getPatternDatabase(side, pattern) for pattern in partition]
+        self.__name__ = 'patternHeuristic'
+
+    def __call__(self, state, problem):
+        positions = [0] * self.cells
+        for cell, tile in enumerate(problem.getTiles(state)):
+            positions[tile] = cell
+        return sum([database.lookup(positions) for database in self.databases])
+
+
+def readCommand(argv):
+    usageStr = """
+    USAGE:      python patternDatabase.py <options>
+    EXAMPLES:   (1) python patternDatabase.py -s 4
+                    - builds the default fifteen puzzle databases
+                (2) python patternDatabase.py -s 4 -p 1,2,3,4,5/6,7,8,9,10/11,12,13,14,15
+                    - builds three stronger but slower fifteen puzzle databases
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-s', '--side', dest='side', type='int', default=3,
+                      help='side length of the puzzle (default: %default)')
+    parser.add_option('-p', '--partition', dest='partition', default=None,
+                      help='patterns separated by /, tiles by commas (default: the built-in partition)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.partition:
+        partition = [tuple([int(tile) for tile in pattern.split(',')])
+                     for pattern in options.partition.split('/')]
+    else:
+        partition = DEFAULT_PARTITIONS[options.side]
+    for pattern in partition:
+        database = getPatternDatabase(options.side, pattern)
+        print('%s: %d entries, at most %d moves, in %s' % (
+            pattern, len(database.table), max(database.table),
+            patternDatabasePath(options.side, pattern)))
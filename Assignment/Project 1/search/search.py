@@ -17,7 +17,16 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import collections
+import contextlib
+import cProfile
+import heapq
+import itertools
+import pstats
+import time
+
 import util
+from game import Actions
 
 
 class SearchProblem:
@@ -62,6 +71,271 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def getGoalState(self):
+        """
+        Returns the single goal state of the problem.  Only needed by the
+        bidirectional solvers, which search backward from it.
+        """
+        util.raiseNotDefined()
+
+    def getPredecessors(self, state):
+        """
+          state: Search state
+
+        The reverse of getSuccessors, only needed by the bidirectional
+        solvers.  This should return a list of triples, (predecessor, action,
+        stepCost), where 'action' leads from 'predecessor' to state at a cost
+        of 'stepCost'.
+        """
+        util.raiseNotDefined()
+
+
+class ReversedSearchProblem(SearchProblem):
+    """
+    A view of a problem with its start and goal swapped, so heuristics written
+    against problem.goal (e.g. manhattanHeuristic) can guide the backward half
+    of a bidirectional search.  Every other attribute is read from the wrapped
+    problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getGoalState(self):
+        return self.goal
+
+
+class SearchStats:
+    """
+    A record of one search run, filled in by InstrumentedProblem, by
+    heuristics wrapped with instrumentHeuristic and by the solvers in this
+    file.  asDict() gives the numbers as a plain dict for collecting runs.
+
+      expanded / generated:  getSuccessors calls and the successors returned
+      maxFrontier / maxClosed:  peak sizes of the open and closed sets
+      heuristicCalls / heuristicTime:  heuristic evaluations and their seconds
+      successorTime:  seconds spent inside getSuccessors
+      wallTime:  seconds spent in the whole search
+      bound:  suboptimality bound of the path, if the solver reports one
+      phaseTimes / profiles:  seconds and cProfile results of each phase
+    """
+
+    FIELDS = ['algorithm', 'problem', 'heuristic', 'expanded', 'generated',
+              'maxFrontier', 'maxClosed', 'heuristicCalls', 'heuristicTime',
+              'successorTime', 'wallTime', 'pathLength', 'pathCost', 'bound']
+
+    def __init__(self, algorithm='', problem='', heuristic=''):
+        self.algorithm = algorithm
+        self.problem = problem
+        self.heuristic = heuristic
+        self.expanded = 0
+        self.generated = 0
+        self.maxFrontier = 0
+        self.maxClosed = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.successorTime = 0.0
+        self.wallTime = 0.0
+        self.pathLength = None
+        self.pathCost = None
+        self.bound = None
+        self.phaseTimes = {}
+        self.profiles = {}
+
+    def recordFrontier(self, frontierSize, closedSize):
+        if frontierSize > self.maxFrontier: self.maxFrontier = frontierSize
+        if closedSize > self.maxClosed: self.maxClosed = closedSize
+
+    @contextlib.contextmanager
+    def phase(self, name, profile=False):
+        """
+        Times the enclosed block as phase 'name'.  With profile set, the block
+        also runs under cProfile and its pstats.Stats is kept in profiles.
+        """
+        profiler = cProfile.Profile() if profile else None
+        start = time.perf_counter()
+        if profiler: profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler:
+                profiler.disable()
+                self.profiles[name] = pstats.Stats(profiler)
+            self.phaseTimes[name] = self.phaseTimes.get(name, 0.0) + time.perf_counter() - start
+
+    def asDict(self):
+        record = dict((field, getattr(self, field)) for field in self.FIELDS)
+        record['phaseTimes'] = dict(self.phaseTimes)
+        return record
+
+    def __str__(self):
+        return ('expanded %d, generated %d, max frontier %d, max closed %d, '
+                'heuristic %d calls in %.3fs, successors %.3fs, wall %.3fs' %
+                (self.expanded, self.generated, self.maxFrontier, self.maxClosed,
+                 self.heuristicCalls, self.heuristicTime, self.successorTime, self.wallTime))
+
+
+class InstrumentedProblem(SearchProblem):
+    """
+    Wraps a search problem so that the successor calls are counted and timed
+    in problem.searchStats.  The solvers in this file also look for
+    searchStats on the problem they are given to record the peak sizes of
+    their frontier and closed set.  Every other attribute is read from the
+    wrapped problem, so heuristics see e.g. problem.walls as usual.
+    """
+
+    def __init__(self, problem, stats):
+        self.problem = problem
+        self.searchStats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        start = time.perf_counter()
+        successors = self.problem.getSuccessors(state)
+        self.searchStats.successorTime += time.perf_counter() - start
+        self.searchStats.expanded += 1
+        self.searchStats.generated += len(successors)
+        return successors
+
+    def getCostOfActions(self, actions):
+        return self.problem.getCostOfActions(actions)
+
+    def getGoalState(self):
+        return self.problem.getGoalState()
+
+    def getPredecessors(self, state):
+        start = time.perf_counter()
+        predecessors = self.problem.getPredecessors(state)
+        self.searchStats.successorTime += time.perf_counter() - start
+        self.searchStats.expanded += 1
+        self.searchStats.generated += len(predecessors)
+        return predecessors
+
+
+def instrumentHeuristic(heuristic):
+    """
+    Wraps a heuristic so that, when it is given an InstrumentedProblem, its
+    calls are counted and timed in that problem's searchStats.  Otherwise it
+    behaves exactly like the heuristic.
+    """
+    def instrumented(state, problem=None):
+        stats = getattr(problem, 'searchStats', None)
+        if stats is None:
+            return heuristic(state, problem)
+        start = time.perf_counter()
+        value = heuristic(state, problem)
+        stats.heuristicTime += time.perf_counter() - start
+        stats.heuristicCalls += 1
+        return value
+    instrumented.__name__ = getattr(heuristic, '__name__', 'heuristic')
+    return instrumented
+
+
+DEFAULT_CACHE_SIZE = 100000
+
+
+class HeuristicCache:
+    """
+    Wraps a heuristic that is a pure function of the state and remembers its
+    values, so states that A* or IDA* evaluate again are not recomputed.  It is
+    called like the heuristic itself:
+
+    > cached = HeuristicCache(foodHeuristic, maxSize=50000)
+    > actions = aStarSearch(problem, cached)
+
+    At most maxSize values are kept; once full, the least recently used one
+    is evicted.  Values are keyed by fingerprint(state) if given, otherwise by
+    problem.fingerprint(state) when the problem has one, otherwise by the
+    state itself.  The cache starts over whenever it is called with a
+    different problem.  hits, misses and evictions count what it did.
+    """
+
+    def __init__(self, heuristic, maxSize=DEFAULT_CACHE_SIZE, fingerprint=None):
+        self.heuristic = heuristic
+        self.maxSize = maxSize
+        self.fingerprint = fingerprint
+        self.__name__ = getattr(heuristic, '__name__', 'heuristic')
+        self.problem = None
+        self.clear()
+
+    def clear(self):
+        self.values = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, state, problem=None):
+        if problem is not self.problem:
+            self.clear()
+            self.problem = problem
+        if self.fingerprint:
+            key = self.fingerprint(state)
+        elif hasattr(problem, 'fingerprint'):
+            key = problem.fingerprint(state)
+        else:
+            key = state
+
+        values = self.values
+        if key in values:
+            self.hits += 1
+            values.move_to_end(key)
+            return values[key]
+        self.misses += 1
+        value = values[key] = self.heuristic(state, problem)
+        if len(values) > self.maxSize:
+            values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def hitRate(self):
+        calls = self.hits + self.misses
+        return float(self.hits) / calls if calls else 0.0
+
+    def __str__(self):
+        return '%s: %d hits, %d misses (%.1f%% hit rate), %d evictions, %d of %d entries' % (
+            self.__name__, self.hits, self.misses, 100 * self.hitRate(), self.evictions,
+            len(self.values), self.maxSize)
+
+
+def runSearch(searchFunction, problem, heuristic=None, profile=False):
+    """
+    Runs searchFunction on problem (with heuristic, if given) and returns
+    the actions together with the SearchStats of the run.
+    """
+    stats = SearchStats(getattr(searchFunction, '__name__', str(searchFunction)),
+                        problem.__class__.__name__,
+                        getattr(heuristic, '__name__', '') if heuristic else '')
+    instrumented = InstrumentedProblem(problem, stats)
+    start = time.perf_counter()
+    with stats.phase('search', profile):
+        if heuristic is None:
+            actions = searchFunction(instrumented)
+        else:
+            actions = searchFunction(instrumented, instrumentHeuristic(heuristic))
+    stats.wallTime = time.perf_counter() - start
+    stats.pathLength = len(actions)
+    stats.pathCost = problem.getCostOfActions(actions)
+    stats.bound = getattr(actions, 'bound', None)
+    return actions, stats
+
 
 def tinyMazeSearch(problem):
     """
@@ -74,6 +348,71 @@ def tinyMazeSearch(problem):
     return [s, s, w, s, w, w, s, w]
 
 
+def bestFirstSearch(problem, priority=None, lifo=False, budget=None):
+    """
+    Generic graph search shared by every solver in this file.
+
+    The frontier is a binary heap of (priority, tiebreak, cost, state, parent,
+    action) entries.  With no priority function entries leave in insertion
+    order (FIFO, or LIFO when lifo is set), otherwise in order of
+    priority(state, cost) where cost is the path cost g of the entry.
+
+    Instead of carrying a copy of the action list on every node, the search
+    keeps the best known g-cost of each state and a back-pointer for each
+    expanded state in dicts.  Entries for states that were already expanded
+    are stale and skipped when popped, and the action list is rebuilt only
+    once, when the goal is popped.
+
+    With a SearchBudget, returns None if it runs out before a goal is found.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    start = problem.getStartState()
+    # best known path cost of every generated state
+    costs = {start: 0}
+    # expanded states with their (parent, action) back-pointer
+    parents = {}
+    counter = itertools.count(1)
+    sign = -1 if lifo else 1
+    frontier = [(priority(start, 0) if priority else 0, 0, 0, start, None, None)]
+
+    while frontier:
+        _, _, cost, state, parent, action = heapq.heappop(frontier)
+        # lazy deletion of stale entries
+        if state in parents:
+            continue
+        parents[state] = (parent, action)
+        if problem.isGoalState(state):
+            return _backtrack(parents, state)
+        if budget is not None and not budget.spend():
+            return None
+
+        for successor, nextAction, stepCost in problem.getSuccessors(state):
+            if successor in parents:
+                continue
+            nextCost = cost + stepCost
+            # a deeper copy of a state only matters for DFS
+            if not lifo and nextCost >= costs.get(successor, float('inf')):
+                continue
+            costs[successor] = nextCost
+            key = priority(successor, nextCost) if priority else 0
+            heapq.heappush(frontier, (key, sign * next(counter), nextCost, successor, state, nextAction))
+        if stats is not None:
+            stats.recordFrontier(len(frontier), len(parents))
+
+    return []
+
+
+def _backtrack(parents, state):
+    """Follows the back-pointers from state to the start state."""
+    actions = []
+    parent, action = parents[state]
+    while parent is not None:
+        actions.append(action)
+        parent, action = parents[parent]
+    actions.reverse()
+    return actions
+
+
 def depthFirstSearch(problem):
     """
     Search the deepest nodes in the search tree first.
@@ -87,93 +426,19 @@ def depthFirstSearch(problem):
     # print("Start:", problem.getStartState())
     # print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     # print("Start's successors:", problem.getSuccessors(problem.getStartState()))
-    path = util.Stack()
-    # discovered nodes with its corresponding path
-    discovered = {}
-    curr_state = problem.getStartState()
-    path.push((curr_state, 'S', 'S'))
-    discovered[curr_state] = []
-    # goal check
-    while not problem.isGoalState(curr_state):
-        successors = problem.getSuccessors(curr_state)
-        # Iterate through the frontier
-        for _ in successors:
-            temp = _[0]
-            # check if the node is already discovered
-            if temp not in discovered:
-                # stores parent and relevant action from parent
-                path.push((temp, _[1], curr_state))
-
-        next_state = path.pop()
-        curr_state = next_state[0]
-        curr_action = [i for i in discovered[next_state[2]]]
-        discovered[curr_state] = curr_action + [next_state[1]]
-
-    return discovered[curr_state]
-    # print(path.list)
-    # util.raiseNotDefined()
+    return bestFirstSearch(problem, lifo=True)
 
 
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
     "*** YOUR CODE HERE ***"
-    path = util.Queue()
-    # discovered nodes with its corresponding path
-    discovered = {}
-    curr_state = problem.getStartState()
-    discovered[curr_state] = []
-    # goal check
-    while not problem.isGoalState(curr_state):
-        successors = problem.getSuccessors(curr_state)
-        past_actions = discovered[curr_state]
-        # Iterate through the frontier
-        for _ in successors:
-            temp = _[0]
-            # check if the node is already discovered
-            if temp not in discovered:
-                path.push(temp)
-                curr_actions = [i for i in past_actions]
-                discovered[temp] = curr_actions + [_[1]]
-
-        curr_state = path.pop()
-
-    return discovered[curr_state]
-    # util.raiseNotDefined()
+    return bestFirstSearch(problem)
 
 
 def uniformCostSearch(problem):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
-    # discovered nodes
-    discovered = {}
-    # queue sorted by nodes with its current path cost
-    path = util.PriorityQueueWithFunction(lambda state: problem.getCostOfActions(state[1]))
-    curr_state = problem.getStartState()
-    discovered[curr_state] = []
-
-    # goal check
-    while not problem.isGoalState(curr_state):
-        successors = problem.getSuccessors(curr_state)
-        # past action history
-        past_actions = discovered[curr_state]
-        # Iterate through the frontier
-        for _ in successors:
-            node = _[0]
-            curr_action = [i for i in past_actions] + [_[1]]
-            # check if the state is already expanded
-            if node not in discovered:
-                path.push([node, curr_action])
-                discovered[node] = curr_action
-            # check if lower cost than current solution
-            elif problem.getCostOfActions(curr_action) < problem.getCostOfActions(discovered[node]):
-                path.push([node, curr_action])
-                discovered[node] = curr_action
-
-        curr_state = path.pop()[0]
-
-    return discovered[curr_state]
-
-    # util.raiseNotDefined()
+    return bestFirstSearch(problem, lambda state, cost: cost)
 
 
 def nullHeuristic(state, problem=None):
@@ -187,35 +452,632 @@ def nullHeuristic(state, problem=None):
 def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
-    # discovered nodes
-    discovered = {}
-    # queue sorted by nodes with its current path cost and heuristic value
-    path = util.PriorityQueueWithFunction(lambda state: problem.getCostOfActions(state[1]) + heuristic(state[0], problem))
-    curr_state = problem.getStartState()
-    discovered[curr_state] = []
-
-    # goal check
-    while not problem.isGoalState(curr_state):
-        successors = problem.getSuccessors(curr_state)
-        # past action history
-        past_actions = discovered[curr_state]
-        # Iterate through the frontier
-        for _ in successors:
-            node = _[0]
-            curr_action = [i for i in past_actions] + [_[1]]
-            # check if the state is already expanded
-            if node not in discovered:
-                path.push([node, curr_action])
-                discovered[node] = curr_action
-            # check if lower cost than current solution
-            elif problem.getCostOfActions(curr_action) < problem.getCostOfActions(discovered[node]):
-                path.push([node, curr_action])
-                discovered[node] = curr_action
-
-        curr_state = path.pop()[0]
-
-    return discovered[curr_state]
-    # util.raiseNotDefined()
+    return bestFirstSearch(problem, lambda state, cost: cost + heuristic(state, problem))
+
+
+def bidirectionalSearch(problem):
+    """
+    Search from the start and from the goal at once, always expanding the
+    side with the smaller frontier, until the two meet on a cheapest path.
+    With unit step costs this is a bidirectional breadth-first search.
+
+    The problem must implement getGoalState and getPredecessors.
+    """
+    return _bidirectionalSearch(problem, None)
+
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    Bidirectional A* with front-to-end heuristics: the forward half is guided
+    by heuristic(state, problem) and the backward half by
+    heuristic(state, ReversedSearchProblem(problem)).
+    """
+    return _bidirectionalSearch(problem, heuristic)
+
+
+def _bidirectionalSearch(problem, heuristic):
+    """
+    Shared body of the bidirectional solvers.  With no heuristic the search
+    stops once the two frontier minima add up to the best meeting cost,
+    otherwise once either frontier's least f-value reaches it.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    start, goal = problem.getStartState(), problem.getGoalState()
+    if problem.isGoalState(start):
+        return []
+
+    if heuristic is None:
+        forwardH = backwardH = lambda state: 0
+    else:
+        reverse = ReversedSearchProblem(problem)
+        forwardH = lambda state: heuristic(state, problem)
+        backwardH = lambda state: heuristic(state, reverse)
+
+    # one dict per direction: best g-costs, back-pointers, closed set, heap
+    forward = {'costs': {start: 0}, 'parents': {start: (None, None)}, 'closed': set(),
+               'frontier': [(forwardH(start), 0, 0, start)],
+               'expand': problem.getSuccessors, 'h': forwardH}
+    backward = {'costs': {goal: 0}, 'parents': {goal: (None, None)}, 'closed': set(),
+                'frontier': [(backwardH(goal), 0, 0, goal)],
+                'expand': problem.getPredecessors, 'h': backwardH}
+    forward['other'], backward['other'] = backward, forward
+    counter = itertools.count(1)
+    # cheapest path found so far and the state where it meets
+    best, meet = float('inf'), None
+
+    while True:
+        for side in forward, backward:
+            frontier, closed = side['frontier'], side['closed']
+            # lazy deletion of stale entries
+            while frontier and frontier[0][3] in closed:
+                heapq.heappop(frontier)
+        if not forward['frontier'] or not backward['frontier']:
+            break
+        forwardKey, backwardKey = forward['frontier'][0][0], backward['frontier'][0][0]
+        if max(forwardKey, backwardKey) >= best:
+            break
+        if heuristic is None and forwardKey + backwardKey >= best:
+            break
+
+        side = forward if len(forward['frontier']) <= len(backward['frontier']) else backward
+        _, _, cost, state = heapq.heappop(side['frontier'])
+        side['closed'].add(state)
+        costs, parents, otherCosts = side['costs'], side['parents'], side['other']['costs']
+
+        for neighbor, action, stepCost in side['expand'](state):
+            nextCost = cost + stepCost
+            if nextCost < costs.get(neighbor, float('inf')):
+                costs[neighbor] = nextCost
+                # backward pointers lead towards the goal, forward ones to the start
+                parents[neighbor] = (state, action)
+                key = nextCost + side['h'](neighbor)
+                heapq.heappush(side['frontier'], (key, next(counter), nextCost, neighbor))
+            if neighbor in otherCosts and costs[neighbor] + otherCosts[neighbor] < best:
+                best, meet = costs[neighbor] + otherCosts[neighbor], neighbor
+        if stats is not None:
+            stats.recordFrontier(len(forward['frontier']) + len(backward['frontier']),
+                                 len(forward['closed']) + len(backward['closed']))
+
+    if meet is None:
+        return []
+    actions = _backtrack(forward['parents'], meet)
+    state = meet
+    while backward['parents'][state][0] is not None:
+        state, action = backward['parents'][state]
+        actions.append(action)
+    return actions
+
+
+DEFAULT_TABLE_SIZE = 100000
+DEFAULT_NODE_BUDGET = 100000
+
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, tableSize=DEFAULT_TABLE_SIZE):
+    """
+    Iterative-deepening A*: repeated depth-first searches that cut off every
+    path whose f = g + h exceeds a bound, raising the bound to the least f
+    that was cut off until a goal is found.
+
+    Memory stays proportional to the solution depth plus a transposition
+    table of at most tableSize states.  The table remembers the least g at
+    which each state was reached in the current iteration, so a state reached
+    again at no smaller cost is not searched twice; once full, the least
+    recently used states are evicted.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return []
+    bound = heuristic(start, problem)
+    while bound != float('inf'):
+        actions, bound = _costBoundedSearch(problem, heuristic, start, bound, tableSize, stats)
+        if actions is not None:
+            return actions
+    return []
+
+
+def _costBoundedSearch(problem, heuristic, start, bound, tableSize, stats):
+    """
+    One iteration of iterativeDeepeningAStarSearch.  Returns the actions to a
+    goal within the bound, or None and the least f-value that exceeded it.
+    """
+    table = collections.OrderedDict()
+    nextBound = float('inf')
+    # the current path and, for every state on it, its unexplored successors
+    states, actions, costs, onPath = [start], [], [0], set([start])
+    successors = [iter(problem.getSuccessors(start))]
+
+    while successors:
+        for successor, action, stepCost in successors[-1]:
+            if successor in onPath:
+                continue
+            cost = costs[-1] + stepCost
+            f = cost + heuristic(successor, problem)
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+            if table.get(successor, float('inf')) <= cost:
+                continue
+            table[successor] = cost
+            table.move_to_end(successor)
+            if len(table) > tableSize:
+                table.popitem(last=False)
+            if problem.isGoalState(successor):
+                return actions + [action], bound
+
+            states.append(successor)
+            actions.append(action)
+            costs.append(cost)
+            onPath.add(successor)
+            successors.append(iter(problem.getSuccessors(successor)))
+            if stats is not None:
+                stats.recordFrontier(len(successors), len(table))
+            break
+        else:
+            # every successor was tried, back up one step
+            successors.pop()
+            onPath.discard(states.pop())
+            costs.pop()
+            if actions: actions.pop()
+
+    return None, nextBound
+
+
+class _MemoryNode:
+    """A search tree node of simplifiedMemoryBoundedAStarSearch."""
+    __slots__ = ('state', 'parent', 'action', 'cost', 'f', 'depth', 'successors',
+                 'nextIndex', 'children', 'forgottenF', 'entry')
+
+    def __init__(self, state, parent, action, cost, f):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+        self.f = f
+        self.depth = parent.depth + 1 if parent else 0
+        # the problem's successors, generated into children one at a time
+        self.successors = None
+        self.nextIndex = 0
+        self.children = {}
+        # least f-value of the children dropped to free memory
+        self.forgottenF = float('inf')
+        # tiebreak of the node's current frontier entries, None off the frontier
+        self.entry = None
+
+    def isAncestor(self, state):
+        node = self
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    def isComplete(self):
+        return self.successors is not None and self.nextIndex == len(self.successors)
+
+    def path(self):
+        actions, node = [], self
+        while node.parent is not None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+
+def simplifiedMemoryBoundedAStarSearch(problem, heuristic=nullHeuristic, maxNodes=DEFAULT_NODE_BUDGET):
+    """
+    Simplified memory-bounded A* (SMA*): A* over a search tree of at most
+    maxNodes nodes.  The deepest least-f leaf generates one successor at a
+    time; when the tree is full the shallowest highest-f leaf is dropped and
+    its parent remembers the least f it forgot, so that branch is generated
+    again only once nothing better remains.  A node's f backs up to the least
+    f of its children once all of them have been generated.
+
+    Returns the cheapest path that fits in maxNodes nodes, which is an optimal
+    one whenever the heuristic is admissible and the budget exceeds its depth.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    infinity = float('inf')
+    counter = itertools.count()
+    # least f (deepest first) for expansion, greatest f (shallowest first) for dropping
+    best, worst = [], []
+    root = _MemoryNode(problem.getStartState(), None, None, 0, 0)
+    root.f = heuristic(root.state, problem)
+    # the cheapest node in memory for every state
+    inMemory = {root.state: root}
+    size = [1]
+
+    def push(node):
+        node.entry = next(counter)
+        heapq.heappush(best, (node.f, -node.depth, node.entry, node))
+        heapq.heappush(worst, (-node.f, node.depth, node.entry, node))
+        # stale entries are thrown away once they outnumber live ones
+        if len(best) > 4 * size[0] + 16:
+            live = [entry for entry in best if entry[3].entry == entry[2]]
+            best[:] = live
+            worst[:] = [(-f, -negatedDepth, entry, node) for f, negatedDepth, entry, node in live]
+            heapq.heapify(best)
+            heapq.heapify(worst)
+
+    def dropWorstLeaf(keep):
+        skipped, dropped = [], None
+        while worst:
+            entry = heapq.heappop(worst)
+            node = entry[3]
+            if node.entry != entry[2]:
+                continue
+            if node is keep or node.children or node.parent is None:
+                skipped.append(entry)
+                continue
+            dropped = node
+            break
+        for entry in skipped:
+            heapq.heappush(worst, entry)
+        if dropped is None:
+            return False
+        dropped.entry = None
+        parent = dropped.parent
+        del parent.children[dropped.state]
+        if inMemory.get(dropped.state) is dropped:
+            del inMemory[dropped.state]
+        parent.forgottenF = min(parent.forgottenF, dropped.f)
+        if parent.entry is None:
+            push(parent)
+        size[0] -= 1
+        return True
+
+    def backup(node):
+        while node is not None and node.isComplete():
+            f = min([child.f for child in node.children.values()] + [node.forgottenF])
+            if f == node.f:
+                break
+            node.f = f
+            if node.entry is not None:
+                push(node)
+            node = node.parent
+
+    push(root)
+    while best:
+        f, _, entry, node = best[0]
+        if node.entry != entry:
+            heapq.heappop(best)
+            continue
+        if f == infinity:
+            break
+        if problem.isGoalState(node.state):
+            return node.path()
+
+        if node.successors is None:
+            node.successors = problem.getSuccessors(node.state)
+        elif node.isComplete():
+            # back on top for its forgotten children, so generate them again
+            node.nextIndex = 0
+            node.forgottenF = infinity
+        child = None
+        while child is None and node.nextIndex < len(node.successors):
+            state, action, stepCost = node.successors[node.nextIndex]
+            node.nextIndex += 1
+            cost = node.cost + stepCost
+            # a copy of the state already in memory at no greater cost covers this one
+            if state in node.children or state in inMemory and inMemory[state].cost <= cost \
+                    or node.isAncestor(state):
+                continue
+            child = _MemoryNode(state, node, action, cost, 0)
+            # a non-goal leaf at the depth limit can never reach a goal in memory
+            if child.depth >= maxNodes - 1 and not problem.isGoalState(state):
+                child.f = infinity
+            else:
+                child.f = max(node.f, cost + heuristic(state, problem))
+            node.children[state] = child
+            inMemory[state] = child
+            size[0] += 1
+            push(child)
+
+        if node.isComplete():
+            if node.children and node.forgottenF == infinity:
+                # every successor is in memory, so the node leaves the frontier
+                node.entry = None
+            backup(node)
+        while size[0] > maxNodes and dropWorstLeaf(node):
+            pass
+        if stats is not None:
+            stats.recordFrontier(len(best), size[0])
+
+    return []
+
+
+class SearchBudget:
+    """
+    A limit on the seconds and/or node expansions of a search; None means no
+    limit.  spend() accounts for one expansion and tells whether the search
+    may go on.
+    """
+
+    def __init__(self, timeLimit=None, maxExpansions=None):
+        self.deadline = time.perf_counter() + timeLimit if timeLimit is not None else None
+        self.expansionsLeft = maxExpansions
+
+    def spend(self):
+        if self.expansionsLeft is not None:
+            self.expansionsLeft -= 1
+            if self.expansionsLeft < 0:
+                return False
+        return self.deadline is None or time.perf_counter() < self.deadline
+
+
+class BoundedPath(list):
+    """
+    The actions found by a budgeted solver, with their suboptimality bound:
+    their cost is at most bound times the optimal cost, given an admissible
+    and consistent heuristic.  The bound is infinite when there is no path or
+    the solver cannot tell.
+    """
+
+    def __init__(self, actions=(), bound=float('inf')):
+        list.__init__(self, actions)
+        self.bound = bound
+
+
+DEFAULT_WEIGHT = 2.0
+DEFAULT_BEAM_WIDTH = 100
+
+
+def weightedAStarSearch(problem, heuristic=nullHeuristic, weight=DEFAULT_WEIGHT,
+                        timeLimit=None, maxExpansions=None):
+    """
+    A* on g + weight * h.  Returns a BoundedPath whose bound is the weight,
+    or an empty one if the budget runs out first.
+    """
+    budget = SearchBudget(timeLimit, maxExpansions)
+    actions = bestFirstSearch(problem, lambda state, cost: cost + weight * heuristic(state, problem),
+                              budget=budget)
+    if actions is None or (actions == [] and not problem.isGoalState(problem.getStartState())):
+        return BoundedPath()
+    return BoundedPath(actions, weight)
+
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5,
+                                timeLimit=None, maxExpansions=None):
+    """
+    Anytime repairing A* (ARA*): a weighted A* with a large weight finds a
+    first path fast, then the weight is lowered step by step down to 1 and
+    each search reuses the previous one, only expanding states whose cost
+    improved since.  Once the budget runs out, returns the best path found so
+    far as a BoundedPath, whose bound is the lesser of the current weight and
+    its cost over the least g + h on the frontier.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    budget = SearchBudget(timeLimit, maxExpansions)
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return BoundedPath([], 1.0)
+
+    estimates = {}
+    def h(state):
+        if state not in estimates:
+            estimates[state] = heuristic(state, problem)
+        return estimates[state]
+
+    costs = {start: 0}
+    parents = {start: (None, None)}
+    counter = itertools.count()
+    opened, closed, inconsistent = set([start]), set(), set()
+    frontier = [(weight * h(start), next(counter), start)]
+    goalCost, goal = float('inf'), None
+    best = BoundedPath()
+    proven = float('inf')
+
+    while True:
+        exhausted = False
+        while frontier:
+            key, _, state = frontier[0]
+            if state not in opened or key != costs[state] + weight * h(state):
+                heapq.heappop(frontier)
+                continue
+            if key >= goalCost:
+                break
+            if not budget.spend():
+                exhausted = True
+                break
+            heapq.heappop(frontier)
+            opened.discard(state)
+            closed.add(state)
+            for successor, action, stepCost in problem.getSuccessors(state):
+                nextCost = costs[state] + stepCost
+                if nextCost >= costs.get(successor, float('inf')):
+                    continue
+                costs[successor] = nextCost
+                parents[successor] = (state, action)
+                if nextCost < goalCost and problem.isGoalState(successor):
+                    goalCost, goal = nextCost, successor
+                if successor in closed:
+                    # improved after its expansion in this round, saved for the next one
+                    inconsistent.add(successor)
+                else:
+                    opened.add(successor)
+                    heapq.heappush(frontier, (nextCost + weight * h(successor), next(counter), successor))
+            if stats is not None:
+                stats.recordFrontier(len(opened), len(closed))
+
+        if goal is None:
+            break
+        if not exhausted:
+            # a finished round proves its weight
+            proven = weight
+        lowest = min([costs[state] + h(state) for state in opened | inconsistent] + [goalCost])
+        bound = min(proven, float(goalCost) / lowest) if lowest > 0 else 1.0
+        best = BoundedPath(_backtrack(parents, goal), max(bound, 1.0))
+        if exhausted or best.bound <= 1.0:
+            break
+
+        weight = max(1.0, weight - weightStep)
+        opened |= inconsistent
+        inconsistent, closed = set(), set()
+        frontier = [(costs[state] + weight * h(state), next(counter), state) for state in opened]
+        heapq.heapify(frontier)
+
+    if stats is not None:
+        stats.bound = best.bound
+    return best
+
+
+def beamSearch(problem, heuristic=nullHeuristic, width=DEFAULT_BEAM_WIDTH,
+               timeLimit=None, maxExpansions=None):
+    """
+    Breadth-first search that keeps only the width states of least g + h in
+    each layer, so memory stays proportional to width times the depth.  Gives
+    no quality guarantee: the BoundedPath it returns has an infinite bound.
+    """
+    budget = SearchBudget(timeLimit, maxExpansions)
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return BoundedPath([], 1.0)
+    parents = {start: (None, None)}
+    costs = {start: 0}
+    layer = [start]
+    counter = itertools.count()
+    while layer:
+        # successor -> (g + h, tiebreak, g, parent, action) of its best entry in this layer
+        candidates = {}
+        for state in layer:
+            if not budget.spend():
+                return BoundedPath()
+            for successor, action, stepCost in problem.getSuccessors(state):
+                if successor in parents:
+                    continue
+                cost = costs[state] + stepCost
+                if successor in candidates and candidates[successor][2] <= cost:
+                    continue
+                if problem.isGoalState(successor):
+                    parents[successor] = (state, action)
+                    return BoundedPath(_backtrack(parents, successor))
+                candidates[successor] = (cost + heuristic(successor, problem), next(counter), cost, state, action)
+        layer = []
+        for _, _, cost, parent, action, successor in heapq.nsmallest(
+                width, [entry + (successor,) for successor, entry in candidates.items()]):
+            parents[successor] = (parent, action)
+            costs[successor] = cost
+            layer.append(successor)
+    return BoundedPath()
+
+
+def jumpPointSearch(problem, heuristic=nullHeuristic):
+    """
+    Jump point search: A* over a 4-connected grid with unit step costs that
+    only stops at jump points, the cells where an optimal path may have to
+    turn.  From each expanded cell the search slides in a straight line
+    until it reaches the goal, a dead end, or a cell with a forced
+    neighbor: an open side cell whose counterpart one step back is a wall.
+    A vertical slide also stops where a horizontal slide from it would find
+    a jump point.  Straight corridors and open rooms thus cost one
+    expansion per turn instead of one per cell.
+
+    The problem needs walls, getGoalState() and (x, y) states, like
+    PositionSearchProblem.  Only jump points go through getSuccessors, so
+    the expansion count is the number of jump points expanded.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    walls, goal = problem.walls, problem.getGoalState()
+    width, height = walls.width, walls.height
+
+    def isOpen(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jump(x, y, dx, dy):
+        "Slides from (x, y) in direction (dx, dy) to the next jump point, or None."
+        while isOpen(x, y):
+            if (x, y) == goal:
+                return x, y
+            if dx:
+                if (isOpen(x, y + 1) and not isOpen(x - dx, y + 1)) or \
+                        (isOpen(x, y - 1) and not isOpen(x - dx, y - 1)):
+                    return x, y
+            else:
+                if (isOpen(x + 1, y) and not isOpen(x + 1, y - dy)) or \
+                        (isOpen(x - 1, y) and not isOpen(x - 1, y - dy)):
+                    return x, y
+                if jump(x + 1, y, 1, 0) or jump(x - 1, y, -1, 0):
+                    return x, y
+            x, y = x + dx, y + dy
+        return None
+
+    start = problem.getStartState()
+    costs = {start: 0}
+    # expanded jump points with the jump point they were reached from
+    parents = {}
+    counter = itertools.count(1)
+    frontier = [(heuristic(start, problem), 0, 0, start, None)]
+    while frontier:
+        _, _, cost, state, parent = heapq.heappop(frontier)
+        if state in parents:
+            continue
+        parents[state] = parent
+        if problem.isGoalState(state):
+            return _straightActions([state] + _jumpPath(parents, parent))
+
+        x, y = state
+        if parent is None:
+            directions = None
+        else:
+            # moving on, plus turning to either side; going back never helps
+            dx, dy = (x > parent[0]) - (x < parent[0]), (y > parent[1]) - (y < parent[1])
+            directions = [(dx, dy), (dy, dx), (-dy, -dx)]
+        for (nextx, nexty), _, _ in problem.getSuccessors(state):
+            direction = (nextx - x, nexty - y)
+            if directions is not None and direction not in directions:
+                continue
+            point = jump(nextx, nexty, direction[0], direction[1])
+            if point is None or point in parents:
+                continue
+            nextCost = cost + abs(point[0] - x) + abs(point[1] - y)
+            if nextCost >= costs.get(point, float('inf')):
+                continue
+            costs[point] = nextCost
+            heapq.heappush(frontier, (nextCost + heuristic(point, problem), next(counter), nextCost, point, state))
+        if stats is not None:
+            stats.recordFrontier(len(frontier), len(parents))
+    return []
+
+
+def _jumpPath(parents, point):
+    "The jump points from point back to the start."
+    points = []
+    while point is not None:
+        points.append(point)
+        point = parents[point]
+    return points
+
+
+def _straightActions(points):
+    "Expands jump points, given from the goal back to the start, into actions."
+    actions = []
+    for (x, y), (prevx, prevy) in zip(reversed(points[:-1]), reversed(points[1:])):
+        dx, dy = (x > prevx) - (x < prevx), (y > prevy) - (y < prevy)
+        actions += [Actions.vectorToDirection((dx, dy))] * (abs(x - prevx) + abs(y - prevy))
+    return actions
+
+
+def hierarchicalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    HPA*-style search over the corridor graph of the problem's layout (see
+    layoutGraph.py): A* runs over junctions, dead ends and food cells, one
+    corridor per step, and only the corridors of the path found are
+    expanded into moves.  heuristic guides the graph search and must be
+    consistent for the path to be optimal.
+
+    The problem needs layout, getGoalState() and (x, y) states with unit
+    step costs, like PositionSearchProblem.  getSuccessors is never called;
+    searchStats counts the graph nodes expanded instead.
+    """
+    stats = getattr(problem, 'searchStats', None)
+    graph = problem.layout.getLayoutGraph()
+    estimate = lambda cell: heuristic(cell, problem)
+    cost, cells, expanded = graph.search(problem.getStartState(), problem.getGoalState(), estimate)
+    if stats is not None:
+        stats.expanded += expanded
+    if cells is None:
+        return []
+    return _straightActions(cells[::-1])
 
 
 # Abbreviations
@@ -223,3 +1085,12 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bds = bidirectionalSearch
+bdastar = bidirectionalAStarSearch
+ida = iterativeDeepeningAStarSearch
+sma = simplifiedMemoryBoundedAStarSearch
+wastar = weightedAStarSearch
+arastar = anytimeRepairingAStarSearch
+beam = beamSearch
+jps = jumpPointSearch
+hpa = hierarchicalAStarSearch
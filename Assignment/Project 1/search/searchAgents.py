@@ -37,9 +37,13 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import toBitGrid
+from distanceCalculator import getDistanceOracle
+import collections
 import util
 import time
 import search
+import searchEvents
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -73,13 +77,20 @@ class SearchAgent(Agent):
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', profile=False, cache=0,
+                 timeLimit=None):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
+        # a time budget needs a solver that stops inside it
+        if timeLimit is not None:
+            if 'timeLimit' not in func.__code__.co_varnames:
+                raise AttributeError(fn + ' does not take a timeLimit; try anytimeRepairingAStarSearch.')
+            print('[SearchAgent] planning within %s seconds' % timeLimit)
+        self.searchName, self.heuristicName = fn, ''
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
             self.searchFunction = func
@@ -92,13 +103,23 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.heuristicName = heuristic
+            # cache=N memoizes up to N heuristic values
+            if int(cache) > 0:
+                heur = self.heuristicCache = search.HeuristicCache(heur, int(cache))
+            heur = search.instrumentHeuristic(heur)
+            if timeLimit is not None:
+                self.searchFunction = lambda x: func(x, heuristic=heur, timeLimit=float(timeLimit))
+            else:
+                self.searchFunction = lambda x: func(x, heuristic=heur)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
             raise AttributeError(prob + ' is not a search problem type in SearchAgents.py.')
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
+        # Command line arguments arrive as strings
+        self.profile = profile not in [False, 'False', 'false', '0']
 
     def registerInitialState(self, state):
         """
@@ -111,11 +132,32 @@ class SearchAgent(Agent):
         """
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
-        problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        profile = getattr(self, 'profile', False)
+        self.searchStats = search.SearchStats(getattr(self, 'searchName', ''),
+                                              getattr(self.searchType, '__name__', ''),
+                                              getattr(self, 'heuristicName', ''))
+        with self.searchStats.phase('problem', profile):
+            problem = self.searchType(state) # Makes a new search problem
+        with self.searchStats.phase('search', profile):
+            self.actions  = self.searchFunction(search.InstrumentedProblem(problem, self.searchStats)) # Find a path
+        if getattr(problem, 'events', None):
+            # draw what is left when the search ends without a goal event
+            problem.events.flush()
         totalCost = problem.getCostOfActions(self.actions)
+        self.searchStats.wallTime = time.time() - starttime
+        self.searchStats.pathLength, self.searchStats.pathCost = len(self.actions), totalCost
+        self.searchStats.bound = getattr(self.actions, 'bound', None)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
+        if self.searchStats.bound is not None:
+            print('Cost is at most %.2f times the optimal cost' % self.searchStats.bound)
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if profile:
+            print('Search stats: %s' % self.searchStats)
+            if getattr(self, 'heuristicCache', None):
+                print('Heuristic cache: %s' % self.heuristicCache)
+            for phase, profileStats in self.searchStats.profiles.items():
+                print('[SearchAgent] profile of phase %s' % phase)
+                profileStats.sort_stats('cumulative').print_stats(15)
 
     def getAction(self, state):
         """
@@ -153,6 +195,8 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.neighbors = Actions.getNeighborTable(self.walls)
+        self.layout = gameState.data.layout
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -161,8 +205,9 @@ class PositionSearchProblem(search.SearchProblem):
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print('Warning: this does not look like a regular search maze')
 
-        # For display purposes
-        self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
+        # For display purposes: expansions go to the display in batches, if there is one
+        self.events = searchEvents.getDisplayStream() if visualize else None
+        self._expanded = 0 # DO NOT CHANGE
 
     def getStartState(self):
         return self.startState
@@ -171,12 +216,8 @@ class PositionSearchProblem(search.SearchProblem):
         isGoal = state == self.goal
 
         # For display purposes only
-        if isGoal and self.visualize:
-            self._visitedlist.append(state)
-            import __main__
-            if '_display' in dir(__main__):
-                if 'drawExpandedCells' in dir(__main__._display): #@UndefinedVariable
-                    __main__._display.drawExpandedCells(self._visitedlist) #@UndefinedVariable
+        if isGoal and self.events:
+            self.events.publish('goal', state)
 
         return isGoal
 
@@ -192,24 +233,36 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        costFn = self.costFn
+        successors = [(nextState, action, costFn(nextState)) for nextState, action in self.neighbors[state]]
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
-        if state not in self._visited:
-            self._visited[state] = True
-            self._visitedlist.append(state)
+        if self.events:
+            self.events.publish('expand', state)
 
         return successors
 
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns the positions from which one move reaches state, the action
+        that makes that move, and its cost.  Used by the bidirectional
+        solvers in search.py.
+        """
+        cost = self.costFn(state)
+        # moves are reversible: each neighbor reaches state with the opposite action
+        predecessors = [(prevState, Directions.REVERSE[action], cost) for prevState, action in self.neighbors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if self.events:
+            self.events.publish('expand', state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -278,6 +331,8 @@ class CornersProblem(search.SearchProblem):
         Stores the walls, pacman's starting position and corners.
         """
         self.walls = startingGameState.getWalls()
+        self.neighbors = Actions.getNeighborTable(self.walls)
+        self.layout = startingGameState.data.layout
         self.startingPosition = startingGameState.getPacmanPosition()
         top, right = self.walls.height-2, self.walls.width-2
         self.corners = ((1,1), (1,top), (right, 1), (right, top))
@@ -325,32 +380,17 @@ class CornersProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-            x, y, _ = state
-
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                pos = (nextx, nexty)
-                if pos in self.corners and _[self.corners.index(pos)] != 0:
-                    # reaches one corner
-                    new_state = [i for i in _]
-                    new_state[self.corners.index(pos)] = 0
-                    nextState = (nextx, nexty, tuple(new_state))
-                    # update game state
-                    successors.append((nextState, action, 1))
-                else:
-                    # nodes need to be at same time dimension
-                    nextState = (nextx, nexty, tuple([i for i in _]))
-                    successors.append((nextState, action, 1))
+        "*** YOUR CODE HERE ***"
+        x, y, _ = state
+        for pos, action in self.neighbors[(x, y)]:
+            if pos in self.corners and _[self.corners.index(pos)] != 0:
+                # reaches one corner
+                new_state = list(_)
+                new_state[self.corners.index(pos)] = 0
+                successors.append(((pos[0], pos[1], tuple(new_state)), action, 1))
+            else:
+                # nodes need to be at same time dimension
+                successors.append(((pos[0], pos[1], _), action, 1))
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -393,18 +433,9 @@ def cornersHeuristic(state, problem):
     x, y, _ = state
     heu_list = []
 
-    # local function for getSuccessors
+    # local function for getSuccessors, walls have no neighbors
     def localSuccessors(local_state):
-        local_successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            l_x, l_y = local_state
-            l_dx, l_dy = Actions.directionToVector(action)
-            nextx, nexty = int(l_x + l_dx), int(l_y + l_dy)
-            if not walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                local_successors.append(nextState)
-
-        return local_successors
+        return [nextState for nextState, _ in problem.neighbors.get(local_state, ())]
 
     # attempt 1
     # default start position
@@ -714,148 +745,25 @@ def cornersHeuristic(state, problem):
                 
     return min(heu_list)
     '''
-    # attempt 6 L1-path-finder (1512)
-    # reduce maze complexity by waypoints
+    # attempt 7 maze distances over the layout's corridor graph (801)
+    # the graph (layoutGraph.py) takes over the waypoints of attempt 6 (1512):
+    # distances from every junction, dead end and food cell to each corner,
     # calculated once
-    if 'waypoints' not in problem.way_points:
-        waypoints = [g for g in corners]
-        for i in range(1, width - 1):
-            for j in range(1, height - 1):
-                curr_pos = (i, j)
-                # get available directions
-                successors = localSuccessors(curr_pos)
-                # guaranteed turning point
-                if len(successors) > 2:
-                    if curr_pos not in waypoints:
-                        waypoints.append(curr_pos)
-                # might be cornered point or straight line
-                elif len(successors) == 2:
-                    d1 = successors[0]
-                    d2 = successors[1]
-                    # check if not on a straight line
-                    if d1[0] != d2[0] and d1[1] != d2[1]:
-                        if curr_pos not in waypoints:
-                            waypoints.append(curr_pos)
-
-        problem.way_points['waypoints'] = waypoints
-
-        # BFS from waypoints to all goals
-        for node in waypoints:
-            # cache for calculated heuristic
-            heu_cache = [0 for _ in range(len(corners))]
-            # 0 - unexplored, 1 - explored
-            explored_goal = 0
-            # cost from current position
-            path = util.Queue()
-            discovered = []
-            curr_state = node
-            path.push((curr_state, 0))
-            discovered.append(curr_state)
-            # if start from goal
-            if curr_state in corners:
-                heu_cache[corners.index(curr_state)] = 0
-                explored_goal += 1
+    graph = problem.layout.getLayoutGraph()
+    if 'corners' not in problem.way_points:
+        problem.way_points['corners'] = [graph.distancesFrom(corner) for corner in corners]
+    tables = problem.way_points['corners']
 
-            # until all goals are reached
-            while explored_goal != len(corners):
-                curr_state = path.pop()
-                successors = localSuccessors(curr_state[0])
-                for _ in successors:
-                    temp = _
-                    if temp not in discovered:
-                        curr_cost = curr_state[1] + 1
-                        path.push((temp, curr_cost))
-                        discovered.append(temp)
-                        # goal check
-                        if temp in corners:
-                            heu_cache[corners.index(temp)] = curr_cost
-                            explored_goal += 1
-
-            # store cache into precompute dictionary
-            problem.way_points[node] = heu_cache
-
-    curr_state = (x, y)
-    if curr_state in problem.way_points:
-        return min(problem.way_points[curr_state])
-
-    # BFS on current position to find nearby waypoint, relative fast
-    '''
-    path = util.Queue()
-    path.push((curr_state, 0))
-    discovered = [curr_state]
-    # cost to nearby waypoint
-    while True:
-        curr_state = path.pop()
-        successors = localSuccessors(curr_state[0])
-        for _ in successors:
-            temp = _
-            if temp not in discovered:
-                curr_cost = curr_state[1] + 1
-                path.push((temp, curr_cost))
-                discovered.append(temp)
-                # goal check
-                if temp in problem.way_points:
-                    pre_heu = [curr_cost + _ for _ in problem.way_points[temp]]
-                    # get only cost of available goals, 999999 otherwise
-                    for index in range(len(_)):
-                        if _[index] == 0:
-                            pre_heu[index] = 999999
-                    # minimum cost
-                    heu_list = [_ for _ in pre_heu]
-
-                    return min(heu_list)
-    '''
-    # reachable waypoints from current location and cost
-    reachable_list = []
-    # +x direction
-    for _ in range(width):
-        curr_pos = (x + _, y)
-        # if hit wall
-        if walls[x + _][y]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.way_points:
-            reachable_list.append((curr_pos, _))
-            break
-    # -x direction
-    for _ in range(width):
-        curr_pos = (x - _, y)
-        # if hit wall
-        if walls[x - _][y]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.way_points:
-            reachable_list.append((curr_pos, _))
-            break
-    # +y direction
-    for _ in range(height):
-        curr_pos = (x, y + _)
-        # if hit wall
-        if walls[x][y + _]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.way_points:
-            reachable_list.append((curr_pos, _))
-            break
-    # -y direction
-    for _ in range(height):
-        curr_pos = (x, y - _)
-        # if hit wall
-        if walls[x][y - _]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.way_points:
-            reachable_list.append((curr_pos, _))
-            break
-
-    heu_list = [_[1] + min(problem.way_points[_[0]]) for _ in reachable_list]
-    return min(heu_list)
-    # return 0
+    # the farthest corner left is a lower bound on the rest of the tour
+    for index in range(len(_)):
+        if _[index] == 1:
+            heu_list.append(graph.tableDistance(tables[index], (x, y)))
+    return max(heu_list + [0])
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
+        self.searchFunction = lambda prob: search.aStarSearch(prob, search.instrumentHeuristic(cornersHeuristic))
         self.searchType = CornersProblem
 
 class FoodSearchProblem:
@@ -865,11 +773,13 @@ class FoodSearchProblem:
 
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodGrid:       a BitGrid (see game.py) of either True or False, specifying remaining food
     """
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), toBitGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
+        self.neighbors = Actions.getNeighborTable(self.walls)
+        self.layout = startingGameState.data.layout
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
@@ -884,16 +794,24 @@ class FoodSearchProblem:
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+        for (nextx, nexty), direction in self.neighbors[state[0]]:
+            nextFood = state[1].copy()
+            nextFood[nextx][nexty] = False
+            successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
         return successors
 
+    def getPosition(self, state):
+        "Returns Pacman's position in a search state."
+        return state[0]
+
+    def getFoodList(self, state):
+        "Returns the positions of the food remaining in a search state."
+        return state[1].asList()
+
+    def fingerprint(self, state):
+        "Returns a compact key for a search state, used by search.HeuristicCache."
+        return state[0], state[1].bits
+
     def getCostOfActions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
@@ -909,10 +827,80 @@ class FoodSearchProblem:
         return cost
 
 
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem with compact search states, for food layouts too big
+    to keep a food grid per expanded node.
+
+    A search state is a tuple ( cell, foodMask ) of two ints where
+      cell:     the index of Pacman's position in problem.cells
+      foodMask: bit i is set while problem.foodCells[i] still has food
+
+    Equal states are interned, so the frontier and the closed set share one
+    tuple per distinct state.  Use getPosition and getFoodList to read a state
+    in either problem.  For example:
+
+    > python pacman.py -l bigSearch -p SearchAgent -a fn=astar,prob=CompactFoodSearchProblem,heuristic=foodHeuristic
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        position, foodGrid = self.start
+        self.startingPosition = position
+        self.cells = self.walls.asList(False)
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.foodCells = foodGrid.asList()
+        foodBits = dict((food, 1 << i) for i, food in enumerate(self.foodCells))
+
+        # (next cell, direction, mask that clears its food) for every open cell
+        self.cellMoves = []
+        for cell in self.cells:
+            self.cellMoves.append([(self.cellIndex[nextCell], direction, ~foodBits.get(nextCell, 0))
+                                   for nextCell, direction in self.neighbors[cell]])
+
+        self._interned = {}
+        self.start = self.intern(self.cellIndex[position], (1 << len(self.foodCells)) - 1)
+
+    def intern(self, cell, foodMask):
+        "Returns the canonical state object for ( cell, foodMask )."
+        state = (cell, foodMask)
+        return self._interned.setdefault(state, state)
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        cell, foodMask = state
+        return [(self.intern(nextCell, foodMask & keep), direction, 1)
+                for nextCell, direction, keep in self.cellMoves[cell]]
+
+    def getPosition(self, state):
+        return self.cells[state[0]]
+
+    def getFoodList(self, state):
+        foodMask = state[1]
+        return [food for i, food in enumerate(self.foodCells) if foodMask >> i & 1]
+
+    def fingerprint(self, state):
+        return state
+
+    def getCostOfActions(self, actions):
+        """Returns the cost of a particular sequence of actions.  If those actions
+        include an illegal move, return 999999"""
+        x,y= self.startingPosition
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            if self.walls[x][y]:
+                return 999999
+        return len(actions)
+
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
+        self.searchFunction = lambda prob: search.aStarSearch(prob, search.instrumentHeuristic(foodHeuristic))
         self.searchType = FoodSearchProblem
 
 
@@ -944,155 +932,81 @@ def foodHeuristic(state, problem):
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
     """
-    position, foodGrid = state
     "*** YOUR CODE HERE ***"
-    # 2d list of the game grid
-    food_coord = foodGrid.asList()
-    walls = problem.walls
-    width = walls.width
-    height = walls.height
-    x, y = position
-    # heu_list = []
+    # works for the compact states of CompactFoodSearchProblem as well
+    position, foodList = problem.getPosition(state), problem.getFoodList(state)
+    # maze distances come from the layout's shared distance oracle
+    if 'distances' not in problem.heuristicInfo:
+        problem.heuristicInfo['distances'] = getDistanceOracle(problem.layout)
+    distances = problem.heuristicInfo['distances']
 
-    # local function for getSuccessors
-    def localSuccessors(local_state):
-        local_successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            l_x, l_y = local_state
-            l_dx, l_dy = Actions.directionToVector(action)
-            nextx, nexty = int(l_x + l_dx), int(l_y + l_dy)
-            if not walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                local_successors.append(nextState)
-
-        return local_successors
-
-    # weird edge case
-    if len(food_coord) == 0:
-        return 0
-    # reduce maze complexity by waypoints (14299)
-    # calculated once
-    if 'waypoints' not in problem.heuristicInfo:
-        waypoints = [g for g in food_coord]
-        for i in range(1, width - 1):
-            for j in range(1, height - 1):
-                curr_pos = (i, j)
-                # get available directions
-                successors = localSuccessors(curr_pos)
-                # guaranteed turning point
-                if len(successors) > 2:
-                    if curr_pos not in waypoints:
-                        waypoints.append(curr_pos)
-                # might be cornered point or straight line
-                elif len(successors) == 2:
-                    d1 = successors[0]
-                    d2 = successors[1]
-                    # check if not on a straight line
-                    if d1[0] != d2[0] and d1[1] != d2[1]:
-                        if curr_pos not in waypoints:
-                            waypoints.append(curr_pos)
-
-        problem.heuristicInfo['waypoints'] = waypoints
-
-        # BFS from waypoints to all goals
-        for node in waypoints:
-            # cache for calculated heuristic
-            heu_cache = [0 for _ in range(len(food_coord))]
-            # 0 - unexplored, 1 - explored
-            explored_goal = 0
-            # cost from current position
-            path = util.Queue()
-            discovered = []
-            curr_state = node
-            path.push((curr_state, 0))
-            discovered.append(curr_state)
-            # if start from goal
-            if curr_state in food_coord:
-                heu_cache[food_coord.index(curr_state)] = 0
-                explored_goal += 1
+    # every remaining food still has to be reached, the farthest one last
+    return max([distances.distance(position, food) for food in foodList] + [0])
 
-            # until all goals are reached
-            while explored_goal != len(food_coord):
-                curr_state = path.pop()
-                successors = localSuccessors(curr_state[0])
-                for _ in successors:
-                    temp = _
-                    if temp not in discovered:
-                        curr_cost = curr_state[1] + 1
-                        path.push((temp, curr_cost))
-                        discovered.append(temp)
-                        # goal check
-                        if temp in food_coord:
-                            heu_cache[food_coord.index(temp)] = curr_cost
-                            explored_goal += 1
-
-            # store cache into precompute dictionary
-            problem.heuristicInfo[node] = heu_cache
-
-    curr_state = (x, y)
-    if curr_state in problem.heuristicInfo:
-        return min(problem.heuristicInfo[curr_state])
-
-    reachable_list = []
-    # +x direction
-    for _ in range(width):
-        curr_pos = (x + _, y)
-        # if hit wall
-        if walls[x + _][y]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.heuristicInfo:
-            reachable_list.append((curr_pos, _))
-            break
-    # -x direction
-    for _ in range(width):
-        curr_pos = (x - _, y)
-        # if hit wall
-        if walls[x - _][y]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.heuristicInfo:
-            reachable_list.append((curr_pos, _))
-            break
-    # +y direction
-    for _ in range(height):
-        curr_pos = (x, y + _)
-        # if hit wall
-        if walls[x][y + _]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.heuristicInfo:
-            reachable_list.append((curr_pos, _))
-            break
-    # -y direction
-    for _ in range(height):
-        curr_pos = (x, y - _)
-        # if hit wall
-        if walls[x][y - _]:
-            break
-        # if reached waypoint
-        if curr_pos in problem.heuristicInfo:
-            reachable_list.append((curr_pos, _))
-            break
+# spanning tree weights kept per problem before mstFoodHeuristic starts over
+MST_CACHE_SIZE = 100000
 
-    heu_list = [_[1] + min(problem.heuristicInfo[_[0]]) for _ in reachable_list]
-    return min(heu_list)
+def mstFoodHeuristic(state, problem):
+    """
+    A stronger consistent heuristic for FoodSearchProblem and
+    CompactFoodSearchProblem: the maze distance to the nearest food plus the
+    weight of a minimum spanning tree over the remaining food, whose edges
+    are maze distances.  Every food has to be reached, and any walk through
+    all of them is at least that long.
+
+    The maze distances between all pairs of food are looked up once per
+    problem.  A spanning tree only changes when food is eaten, so its weight
+    is cached by the food bitmask of the state, and moves that eat nothing
+    only cost a pass over the remaining food for the nearest one.
+    """
+    info = problem.heuristicInfo
+    if 'foodDistances' not in info:
+        if 'distances' not in info:
+            info['distances'] = getDistanceOracle(problem.layout)
+        oracle = info['distances']
+        foods = problem.getFoodList(problem.getStartState())
+        info['foodIndex'] = dict((food, i) for i, food in enumerate(foods))
+        info['foodDistances'] = [[oracle.distance(food, other) for other in foods] for food in foods]
+        info['spanningTrees'] = {}
+    distances, foodIndex, trees = info['distances'], info['foodIndex'], info['spanningTrees']
+
+    foodList = problem.getFoodList(state)
+    if not foodList:
+        return 0
+    position = problem.getPosition(state)
+    nearest = min([distances.distance(position, food) for food in foodList])
+
+    foodMask = problem.fingerprint(state)[1]
+    if foodMask not in trees:
+        if len(trees) >= MST_CACHE_SIZE:
+            trees.clear()
+        trees[foodMask] = _spanningTreeWeight([foodIndex[food] for food in foodList],
+                                              info['foodDistances'])
+    return nearest + trees[foodMask]
+
+def _spanningTreeWeight(nodes, distances):
+    "Prim's algorithm on the complete graph over nodes, O(len(nodes)^2)."
+    if len(nodes) < 2:
+        return 0
+    row = distances[nodes[0]]
+    # cheapest edge from the tree to every node outside it
+    edges = dict((node, row[node]) for node in nodes[1:])
+    weight = 0
+    while edges:
+        node = min(edges, key=edges.get)
+        weight += edges.pop(node)
+        row = distances[node]
+        for other in edges:
+            if row[other] < edges[other]:
+                edges[other] = row[other]
+    return weight
 
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
-        self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
-            self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+        # the same path as calling findPathToClosestDot once per dot
+        self.actions = planClosestDots(state.getPacmanPosition(), state.getFood(), state.getWalls())
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -1108,7 +1022,7 @@ class ClosestDotSearchAgent(SearchAgent):
         problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-        food2d = food.asList()
+        food2d = set(food.asList())
         # simplified BFS
         path = util.Queue()
         discovered = {}
@@ -1133,6 +1047,54 @@ class ClosestDotSearchAgent(SearchAgent):
 
         # util.raiseNotDefined()
 
+def planClosestDots(position, food, walls):
+    """
+    Returns the actions of a Pacman that, starting at position, repeatedly
+    walks to the closest remaining dot until every reachable dot is eaten.
+
+    Only Pacman's position is tracked between segments.  Every segment is a
+    breadth-first search over the layout's neighbor table that tests goals
+    against a set of the remaining dots, and all segments share one parent
+    map: an entry counts only if it is stamped with the current segment, so
+    the map is never cleared or rebuilt.
+    """
+    neighbors = Actions.getNeighborTable(walls)
+    remaining = set(food.asList())
+    # cell -> (segment, previous cell, action)
+    parents = {}
+    actions = []
+    segment = 0
+    while remaining:
+        segment += 1
+        parents[position] = (segment, None, None)
+        frontier = collections.deque([position])
+        goal = None
+        while frontier and goal is None:
+            cell = frontier.popleft()
+            for nextCell, action in neighbors[cell]:
+                entry = parents.get(nextCell)
+                if entry is not None and entry[0] == segment:
+                    continue
+                parents[nextCell] = (segment, cell, action)
+                if nextCell in remaining:
+                    goal = nextCell
+                    break
+                frontier.append(nextCell)
+        if goal is None:
+            # the remaining dots are walled off
+            break
+
+        path = []
+        cell = goal
+        while cell != position:
+            _, cell, action = parents[cell]
+            path.append(action)
+        path.reverse()
+        actions += path
+        remaining.discard(goal)
+        position = goal
+    return actions
+
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
     A search problem for finding a path to any food.
@@ -1155,9 +1117,11 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.neighbors = Actions.getNeighborTable(self.walls)
+        self.layout = gameState.data.layout
         self.startState = gameState.getPacmanPosition()
         self.costFn = lambda x: 1
-        self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
+        self.events, self._expanded = None, 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
         """
@@ -1167,7 +1131,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         x,y = state
 
         "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return self.food[x][y]
 
 def mazeDistance(point1, point2, gameState):
     """
@@ -1178,11 +1142,12 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+    The distances are read from the layout's precomputed DistanceOracle
+    (distanceCalculator.py) instead of running a search per query.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return getDistanceOracle(gameState.data.layout).distance(point1, point2)
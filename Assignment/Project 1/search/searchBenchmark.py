@@ -0,0 +1,253 @@
+# searchBenchmark.py
+# ------------------
+
+
+"""
+Benchmarks every solver in search.py on every search problem in
+searchAgents.py over every layout in layouts/, recording time, expansions,
+path cost and peak memory of each run.  To run everything and save the
+results as a baseline:
+
+> python searchBenchmark.py -o baseline.json
+
+Later runs can be compared against it; runs that got slower, expanded more
+nodes, used more memory or found a costlier path are reported, and the
+script exits with status 1 if there are any:
+
+> python searchBenchmark.py -b baseline.json -o current.json
+
+Each run stops once it exceeds its expansion or time budget, so food
+problems on the big layouts do not stall the whole benchmark.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from optparse import OptionParser
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+SOLVERS = ['depthFirstSearch', 'breadthFirstSearch', 'uniformCostSearch', 'aStarSearch',
+           'bidirectionalSearch', 'bidirectionalAStarSearch', 'iterativeDeepeningAStarSearch',
+           'simplifiedMemoryBoundedAStarSearch', 'weightedAStarSearch', 'anytimeRepairingAStarSearch',
+           'beamSearch', 'jumpPointSearch', 'hierarchicalAStarSearch']
+
+# solvers that, like bidirectional search, need a problem with a single goal
+SINGLE_GOAL_SOLVERS = ['jumpPointSearch', 'hierarchicalAStarSearch']
+
+# problem name -> (factory from a GameState, heuristic used by the A* solvers,
+#                  whether it has the single goal and predecessors that bidirectional search
+#                  and the SINGLE_GOAL_SOLVERS need)
+PROBLEMS = {
+    'PositionSearchProblem': (lambda gameState: searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False),
+                              searchAgents.manhattanHeuristic, True),
+    'CornersProblem': (searchAgents.CornersProblem, searchAgents.cornersHeuristic, False),
+    'FoodSearchProblem': (searchAgents.FoodSearchProblem, searchAgents.foodHeuristic, False),
+    'AnyFoodSearchProblem': (searchAgents.AnyFoodSearchProblem, search.nullHeuristic, False),
+}
+
+# measurements where a larger value counts as a regression
+COMPARED = ['time', 'expanded', 'pathCost', 'peakMemory']
+
+
+class BudgetExceeded(Exception):
+    """Raised by BudgetedProblem once a run uses up its budget."""
+    pass
+
+
+class BudgetedProblem:
+    """
+    Wraps a search problem and raises BudgetExceeded when more than
+    maxExpansions nodes are expanded or timeLimit seconds have passed.
+    """
+
+    def __init__(self, problem, maxExpansions, timeLimit):
+        self.problem = problem
+        self.expansionsLeft = maxExpansions
+        self.deadline = time.perf_counter() + timeLimit
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def _spend(self):
+        self.expansionsLeft -= 1
+        if self.expansionsLeft < 0 or time.perf_counter() > self.deadline:
+            raise BudgetExceeded()
+
+    def getSuccessors(self, state):
+        self._spend()
+        return self.problem.getSuccessors(state)
+
+    def getPredecessors(self, state):
+        self._spend()
+        return self.problem.getPredecessors(state)
+
+
+def needsSingleGoal(solverName):
+    return solverName.startswith('bidirectional') or solverName in SINGLE_GOAL_SOLVERS
+
+
+def usesHeuristic(solverName):
+    return 'heuristic' in getattr(search, solverName).__code__.co_varnames
+
+
+def runOne(layoutName, gameState, problemName, solverName, options):
+    """Runs one solver on one problem and returns the record of the run."""
+    record = {'layout': layoutName, 'problem': problemName, 'solver': solverName}
+    factory, heuristic, bidirectional = PROBLEMS[problemName]
+    util.mutePrint()
+    try:
+        problem = factory(gameState)
+    finally:
+        util.unmutePrint()
+    if problemName == 'PositionSearchProblem' and gameState.hasWall(*problem.goal):
+        record['status'] = 'skipped'
+        return record
+    if needsSingleGoal(solverName) and not bidirectional:
+        record['status'] = 'skipped'
+        return record
+
+    budgeted = BudgetedProblem(problem, options.maxExpansions, options.timeLimit)
+    if options.memory:
+        tracemalloc.start()
+    try:
+        actions, stats = search.runSearch(getattr(search, solverName), budgeted,
+                                          heuristic if usesHeuristic(solverName) else None)
+        record['status'] = 'ok'
+        record['time'] = stats.wallTime
+        record['expanded'] = stats.expanded
+        record['pathCost'] = stats.pathCost
+        record['pathLength'] = stats.pathLength
+    except BudgetExceeded:
+        record['status'] = 'budget'
+    except Exception as e:
+        record['status'] = 'error: %s' % e
+    finally:
+        if options.memory:
+            record['peakMemory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return record
+
+
+def runBenchmark(layoutNames, problemNames, solverNames, options):
+    records = []
+    for layoutName in layoutNames:
+        lay = layout.getLayout(layoutName)
+        if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+        gameState = pacman.GameState()
+        gameState.initialize(lay, 0)
+        for problemName in problemNames:
+            for solverName in solverNames:
+                record = runOne(layoutName, gameState, problemName, solverName, options)
+                records.append(record)
+                if not options.quiet: printRecord(record)
+    return records
+
+
+def printRecord(record):
+    if record['status'] != 'ok':
+        print('%-20s %-22s %-34s %s' % (record['layout'], record['problem'], record['solver'], record['status']))
+        return
+    memory = '%8.1f MB' % (record['peakMemory'] / 1e6) if 'peakMemory' in record else ''
+    print('%-20s %-22s %-34s %8.3fs %8d expanded  cost %-8g%s' %
+          (record['layout'], record['problem'], record['solver'], record['time'],
+           record['expanded'], record['pathCost'], memory))
+
+
+def compareToBaseline(records, baseline, tolerance, minTime, minMemory):
+    """
+    Returns a message for every run that regressed against the baseline
+    records: a solved run that is no longer solved, or a measurement that grew
+    by more than the tolerance factor (path costs must not grow at all, times
+    shorter than minTime and peaks below minMemory bytes are ignored).
+    """
+    key = lambda record: (record['layout'], record['problem'], record['solver'])
+    previous = dict((key(record), record) for record in baseline)
+    regressions = []
+    for record in records:
+        old = previous.get(key(record))
+        if old == None or old['status'] != 'ok':
+            continue
+        name = '%s %s %s' % key(record)
+        if record['status'] != 'ok':
+            regressions.append('%s: %s, was ok' % (name, record['status']))
+            continue
+        for field in COMPARED:
+            if field not in record or field not in old:
+                continue
+            allowed = old[field] if field == 'pathCost' else old[field] * tolerance
+            if field == 'time' and record[field] < minTime:
+                continue
+            if field == 'peakMemory' and record[field] < minMemory:
+                continue
+            if record[field] > allowed:
+                regressions.append('%s: %s %g -> %g' % (name, field, old[field], record[field]))
+    return regressions
+
+
+def readCommand(argv):
+    usageStr = """
+    USAGE:      python searchBenchmark.py <options>
+    EXAMPLES:   (1) python searchBenchmark.py -o baseline.json
+                    - runs everything and saves the results
+                (2) python searchBenchmark.py -l bigMaze,trickySearch -s aStarSearch -b baseline.json
+                    - compares two layouts with A* against a saved baseline
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layouts to run (default: every layout in layouts/)')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(sorted(PROBLEMS)),
+                      help='comma separated search problems to run (default: %default)')
+    parser.add_option('-s', '--solvers', dest='solvers', default=','.join(SOLVERS),
+                      help='comma separated solvers from search.py to run (default: %default)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='write the results to this JSON file')
+    parser.add_option('-b', '--baseline', dest='baseline', default=None,
+                      help='compare the results with this JSON file of an earlier run')
+    parser.add_option('-e', '--maxExpansions', dest='maxExpansions', type='int', default=200000,
+                      help='expansion budget of a single run (default: %default)')
+    parser.add_option('-t', '--timeLimit', dest='timeLimit', type='float', default=10.0,
+                      help='time budget of a single run in seconds (default: %default)')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=1.5,
+                      help='factor by which a measurement may grow before it counts as a regression (default: %default)')
+    parser.add_option('--minTime', dest='minTime', type='float', default=0.05,
+                      help='ignore time regressions of runs faster than this many seconds (default: %default)')
+    parser.add_option('--minMemory', dest='minMemory', type='int', default=1000000,
+                      help='ignore memory regressions of runs peaking below this many bytes (default: %default)')
+    parser.add_option('--noMemory', dest='memory', action='store_false', default=True,
+                      help='do not trace peak memory, which slows the searches down')
+    parser.add_option('-q', '--quiet', dest='quiet', action='store_true', default=False,
+                      help='only print regressions')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.layouts:
+        layoutNames = options.layouts.split(',')
+    else:
+        layoutNames = sorted(name[:-len('.lay')] for name in os.listdir('layouts') if name.endswith('.lay'))
+    records = runBenchmark(layoutNames, options.problems.split(','), options.solvers.split(','), options)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump({'maxExpansions': options.maxExpansions, 'timeLimit': options.timeLimit,
+                       'runs': records}, f, indent=1)
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)['runs']
+        regressions = compareToBaseline(records, baseline, options.tolerance, options.minTime,
+                                        options.minMemory)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        print('%d regressions against %s' % (len(regressions), options.baseline))
+        sys.exit(1 if regressions else 0)
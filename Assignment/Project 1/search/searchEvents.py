@@ -0,0 +1,117 @@
+# searchEvents.py
+# ---------------
+
+
+"""
+A stream of search events for visualisation and recording.
+
+Search problems publish an ('expand', state) event for every state they
+expand and a ('goal', state) event when they find the goal.  The stream
+buffers events and hands them to its subscribers in batches, so drawing or
+recording costs O(1) per expansion instead of replaying the whole list of
+visited states when the goal is found.
+
+PositionSearchProblem gets a stream that paints expanded cells on the
+game display while the search runs, or no stream at all when there is no
+display to draw on (e.g. with -q or -t) or visualize is False, in which
+case nothing is kept.  To record a search instead:
+
+  recorder = ExpansionRecorder(1000)
+  problem.events = SearchEventStream()
+  problem.events.subscribe(recorder)
+"""
+
+import collections
+
+# events handed to the subscribers at a time
+DEFAULT_BATCH_SIZE = 100
+
+# events kept by an ExpansionRecorder
+DEFAULT_RECORD_SIZE = 10000
+
+
+class SearchEventStream:
+    """
+    Buffers (kind, state) events and passes them to every subscriber, a
+    function of a list of events, once batchSize are waiting or when the
+    stream is flushed.  A goal event flushes the stream.
+    """
+
+    def __init__(self, batchSize=DEFAULT_BATCH_SIZE):
+        self.batchSize = batchSize
+        self.buffer = []
+        self.subscribers = []
+
+    def subscribe(self, subscriber):
+        self.subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.remove(subscriber)
+
+    def publish(self, kind, state):
+        self.buffer.append((kind, state))
+        if len(self.buffer) >= self.batchSize or kind == 'goal':
+            self.flush()
+
+    def flush(self):
+        "Hands the waiting events to the subscribers."
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        for subscriber in self.subscribers:
+            subscriber(batch)
+
+
+class ExpansionRecorder:
+    """
+    A subscriber that keeps the last capacity events in a ring buffer and
+    counts them all.
+    """
+
+    def __init__(self, capacity=DEFAULT_RECORD_SIZE):
+        self.events = collections.deque(maxlen=capacity)
+        self.count = 0
+
+    def __call__(self, batch):
+        self.events.extend(batch)
+        self.count += len(batch)
+
+    def states(self, kind='expand'):
+        "The recorded states of one kind of event, oldest first."
+        return [state for eventKind, state in self.events if eventKind == kind]
+
+
+class ExpandedCellsPainter:
+    """
+    A subscriber that paints each newly expanded cell on a display with
+    addExpandedCells (see graphicsDisplay.py), once per cell.  The cells of
+    the previous search are cleared first.
+    """
+
+    def __init__(self, display):
+        self.display = display
+        self.painted = set()
+        display.clearExpandedCells()
+
+    def __call__(self, batch):
+        cells = []
+        for kind, cell in batch:
+            if cell not in self.painted:
+                self.painted.add(cell)
+                cells.append(cell)
+        if cells:
+            self.display.addExpandedCells(cells)
+
+
+def getDisplayStream():
+    """
+    Returns a stream painting on the display of the running game, or None
+    if that display cannot show expanded cells.
+    """
+    import __main__
+    display = getattr(__main__, '_display', None)
+    if display == None or not hasattr(display, 'addExpandedCells'):
+        return None
+    stream = SearchEventStream()
+    stream.subscribe(ExpandedCellsPainter(display))
+    return stream
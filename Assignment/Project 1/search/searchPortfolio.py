@@ -0,0 +1,230 @@
+# searchPortfolio.py
+# ------------------
+
+
+"""
+Runs a portfolio of solver/heuristic configurations on one search problem,
+each in its own process, and keeps the first optimal path.  Once a
+configuration that guarantees optimality finishes, the other processes are
+terminated.  If none does before the time limit, the path with the best
+suboptimality bound (then the least cost) wins.
+
+A configuration is the name of a function in search.py, optionally followed
+by ':' and the name of a heuristic in searchAgents.py or search.py:
+
+> python searchPortfolio.py -l trickySearch -p FoodSearchProblem -c aStarSearch:foodHeuristic,aStarSearch:mstFoodHeuristic,uniformCostSearch
+"""
+
+import multiprocessing
+import queue
+import sys
+import time
+from optparse import OptionParser
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+# solvers whose paths are optimal, given an admissible heuristic
+OPTIMAL_SOLVERS = ['breadthFirstSearch', 'uniformCostSearch', 'aStarSearch', 'bidirectionalSearch',
+                   'bidirectionalAStarSearch', 'iterativeDeepeningAStarSearch',
+                   'simplifiedMemoryBoundedAStarSearch']
+
+DEFAULT_PORTFOLIOS = {
+    'PositionSearchProblem': ['aStarSearch:manhattanHeuristic', 'aStarSearch:euclideanHeuristic',
+                              'bidirectionalSearch', 'bidirectionalAStarSearch:manhattanHeuristic'],
+    'CornersProblem': ['aStarSearch:cornersHeuristic', 'iterativeDeepeningAStarSearch:cornersHeuristic',
+                       'breadthFirstSearch'],
+    'FoodSearchProblem': ['aStarSearch:mstFoodHeuristic', 'aStarSearch:foodHeuristic',
+                          'anytimeRepairingAStarSearch:mstFoodHeuristic'],
+}
+
+
+def parseConfiguration(configuration):
+    """
+    Returns the search function and heuristic (or None) of a configuration
+    string, raising AttributeError for unknown names.
+    """
+    fn, _, heuristicName = configuration.partition(':')
+    if fn not in dir(search):
+        raise AttributeError(fn + ' is not a search function in search.py.')
+    func = getattr(search, fn)
+    if 'heuristic' not in func.__code__.co_varnames:
+        return func, None
+    heuristicName = heuristicName or 'nullHeuristic'
+    for module in [searchAgents, search]:
+        if heuristicName in dir(module):
+            return func, getattr(module, heuristicName)
+    raise AttributeError(heuristicName + ' is not a function in searchAgents.py or search.py.')
+
+
+def boundOf(configuration, actions):
+    "The suboptimality bound of a configuration's path."
+    if hasattr(actions, 'bound'):
+        return actions.bound
+    if getattr(search, configuration.partition(':')[0]).__name__ in OPTIMAL_SOLVERS:
+        return 1.0
+    return float('inf')
+
+
+# share of the remaining time given to solvers that take a time limit
+TIME_SHARE = 0.9
+
+def _solve(problem, index, configuration, results, deadline):
+    "Runs one configuration in a worker process and reports to results."
+    try:
+        func, heuristic = parseConfiguration(configuration)
+        if deadline is not None and 'timeLimit' in func.__code__.co_varnames:
+            # anytime solvers hand in their best path before the deadline
+            timeLimit = max(0.0, (deadline - time.time()) * TIME_SHARE)
+            budgeted = lambda problem, heuristic=search.nullHeuristic: func(problem, heuristic, timeLimit=timeLimit)
+            budgeted.__name__ = func.__name__
+            actions, stats = search.runSearch(budgeted, problem, heuristic)
+        else:
+            actions, stats = search.runSearch(func, problem, heuristic)
+        results.put((index, list(actions), boundOf(configuration, actions), stats.asDict(), None))
+    except Exception as e:
+        results.put((index, None, float('inf'), None, '%s: %s' % (type(e).__name__, e)))
+
+
+def _context():
+    """
+    Forked workers inherit the problem as it is; elsewhere the problem is
+    pickled over to them.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def runPortfolio(problem, configurations, timeLimit=None, processes=None):
+    """
+    Runs every configuration on problem in parallel, at most processes at a
+    time (default: all of them), and returns (actions, winner, records).
+
+    Each record is a dict with the configuration, its status ('optimal',
+    'solved', 'no path', 'error: ...', 'cancelled' or 'timeout'), its bound and, once
+    solved, the path cost and SearchStats fields.  winner is the record of
+    the returned path, or None if no configuration found one.
+    """
+    context = _context()
+    results = context.Queue()
+    processes = processes or len(configurations)
+    deadline = time.time() + timeLimit if timeLimit is not None else None
+    records = [{'configuration': configuration, 'status': 'cancelled', 'bound': float('inf')}
+               for configuration in configurations]
+    waiting = list(range(len(configurations)))
+    running = {}
+    winner = None
+
+    try:
+        while (waiting or running) and winner is None:
+            while waiting and len(running) < processes:
+                index = waiting.pop(0)
+                worker = context.Process(target=_solve, args=(problem, index, configurations[index], results, deadline))
+                worker.daemon = True
+                worker.start()
+                running[index] = worker
+
+            timeout = 1.0 if deadline is None else min(1.0, deadline - time.time())
+            if timeout <= 0:
+                for index in running:
+                    records[index]['status'] = 'timeout'
+                break
+            try:
+                index, actions, bound, stats, error = results.get(timeout=timeout)
+            except queue.Empty:
+                # a worker that crashed never reports
+                for index, worker in list(running.items()):
+                    if worker.exitcode not in [None, 0]:
+                        records[index]['status'] = 'error: exit code %d' % worker.exitcode
+                        running.pop(index).join()
+                continue
+            running.pop(index).join()
+            record = records[index]
+            record['bound'] = bound
+            if error is not None:
+                record['status'] = 'error: ' + error
+                continue
+            if not actions and not problem.isGoalState(problem.getStartState()):
+                record['status'] = 'no path'
+                continue
+            record['status'] = 'optimal' if bound <= 1.0 else 'solved'
+            record['actions'] = actions
+            record['pathCost'] = problem.getCostOfActions(actions)
+            record.update(dict((field, stats[field]) for field in ['expanded', 'wallTime']))
+            if bound <= 1.0:
+                winner = record
+    finally:
+        for worker in running.values():
+            worker.terminate()
+        for worker in running.values():
+            worker.join()
+        results.close()
+
+    if winner is None:
+        solved = [record for record in records if 'actions' in record]
+        if solved:
+            winner = min(solved, key=lambda record: (record['bound'], record['pathCost']))
+    return (winner['actions'] if winner else []), winner, records
+
+
+def readCommand(argv):
+    usageStr = """
+    USAGE:      python searchPortfolio.py <options>
+    EXAMPLES:   (1) python searchPortfolio.py -l mediumCorners -p CornersProblem
+                    - races the default corners portfolio
+                (2) python searchPortfolio.py -l bigSearch -p FoodSearchProblem -t 10
+                    - keeps the best bounded path found within 10 seconds
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-l', '--layout', dest='layout', default='mediumMaze',
+                      help='the layout to search (default: %default)')
+    parser.add_option('-p', '--problem', dest='problem', default='PositionSearchProblem',
+                      help='the search problem type in searchAgents.py (default: %default)')
+    parser.add_option('-c', '--configurations', dest='configurations', default=None,
+                      help='comma separated fn[:heuristic] configurations (default: depends on the problem)')
+    parser.add_option('-t', '--timeLimit', dest='timeLimit', type='float', default=None,
+                      help='seconds before the portfolio settles for the best bounded path')
+    parser.add_option('-j', '--processes', dest='processes', type='int', default=None,
+                      help='configurations run at once (default: all of them)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    lay = layout.getLayout(options.layout)
+    if lay == None: raise Exception("The layout " + options.layout + " cannot be found")
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    if options.configurations:
+        configurations = options.configurations.split(',')
+    else:
+        configurations = DEFAULT_PORTFOLIOS[options.problem]
+    for configuration in configurations:
+        parseConfiguration(configuration)
+
+    util.mutePrint()
+    if options.problem == 'PositionSearchProblem':
+        problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+    else:
+        problem = getattr(searchAgents, options.problem)(gameState)
+    util.unmutePrint()
+
+    start = time.time()
+    actions, winner, records = runPortfolio(problem, configurations, options.timeLimit, options.processes)
+    for record in records:
+        details = ''
+        if 'actions' in record:
+            details = 'cost %d, bound %.2f, %d expanded in %.3fs' % (
+                record['pathCost'], record['bound'], record['expanded'], record['wallTime'])
+        print('%-50s %-10s %s' % (record['configuration'], record['status'], details))
+    if winner:
+        print('Winner: %s with cost %d after %.3fs' % (winner['configuration'], winner['pathCost'], time.time() - start))
+    else:
+        print('No configuration found a path')
@@ -0,0 +1,279 @@
+# slidingPuzzle.py
+# ----------------
+
+
+"""
+N x N sliding tile puzzles (the eight puzzle, the fifteen puzzle, the
+twenty-four puzzle, ...) with each configuration packed into one int.
+
+Cells are numbered row by row and the goal has the blank in cell 0 and
+tile t in cell t, as in eightpuzzle.py.  A packed state holds the tile of
+cell i in bits [(i + 1) * b, (i + 2) * b) and the cell of the blank in its
+lowest b bits, where b is the number of bits needed for the largest tile.
+A move swaps two fields with a few shifts and xors, keeps the blank
+field up to date, and never builds a list of cells.
+
+SlidingPuzzleState offers EightPuzzleState's methods on top of a packed
+state, and SlidingPuzzleSearchProblem searches packed states directly.  To
+solve random fifteen puzzles with A*:
+
+> python slidingPuzzle.py -s 4 -m 60 -n 5 -H pattern
+"""
+
+import random
+import sys
+from optparse import OptionParser
+
+import search
+from patternDatabase import AdditivePatternHeuristic, DEFAULT_PARTITIONS
+
+class SlidingPuzzle:
+    """
+    The layout of an N x N puzzle: the bit width of a cell and, for every
+    cell of the blank, its legal moves as (move, next blank cell, shift of
+    that cell's field, shift of the blank's field).
+    """
+
+    def __init__(self, side):
+        self.side = side
+        self.cells = side * side
+        self.bits = (self.cells - 1).bit_length()
+        self.mask = (1 << self.bits) - 1
+        self.goal = self.pack(list(range(self.cells)))
+        self.moves = []
+        for blank in range(self.cells):
+            row, col = divmod(blank, side)
+            moves = []
+            for move, cell, legal in [('up', blank - side, row != 0),
+                                      ('down', blank + side, row != side - 1),
+                                      ('left', blank - 1, col != 0),
+                                      ('right', blank + 1, col != side - 1)]:
+                if legal:
+                    moves.append((move, cell, cell * self.bits, blank * self.bits))
+            self.moves.append(tuple(moves))
+        # the same moves by name
+        self.moveTo = [dict((entry[0], entry) for entry in moves) for moves in self.moves]
+
+    def pack(self, tiles):
+        "Packs the tiles of the cells, 0 for the blank, into a state."
+        state = 0
+        for tile in reversed(tiles):
+            state = (state << self.bits) | tile
+        return (state << self.bits) | list(tiles).index(0)
+
+    def unpack(self, state):
+        "Returns the tiles of the cells of a state, 0 for the blank."
+        bits, mask = self.bits, self.mask
+        tiles = state >> bits
+        return [(tiles >> (cell * bits)) & mask for cell in range(self.cells)]
+
+    def blank(self, state):
+        return state & self.mask
+
+    def successors(self, state):
+        "Returns (successor, move, 1) for every legal move of a state."
+        bits, mask = self.bits, self.mask
+        tiles = state >> bits
+        successors = []
+        for move, cell, cellShift, blankShift in self.moves[state & mask]:
+            # the blank's field is 0, so two xors move the tile across
+            tile = (tiles >> cellShift) & mask
+            successors.append((((tiles ^ (tile << cellShift) ^ (tile << blankShift)) << bits) | cell, move, 1))
+        return successors
+
+    def result(self, state, move):
+        "Returns the state after a move, raising KeyError if it is illegal."
+        bits, mask = self.bits, self.mask
+        _, cell, cellShift, blankShift = self.moveTo[state & mask][move]
+        tiles = state >> bits
+        tile = (tiles >> cellShift) & mask
+        return ((tiles ^ (tile << cellShift) ^ (tile << blankShift)) << bits) | cell
+
+
+_puzzles = {}
+
+def getSlidingPuzzle(side):
+    "The shared SlidingPuzzle of a side length."
+    if side not in _puzzles:
+        _puzzles[side] = SlidingPuzzle(side)
+    return _puzzles[side]
+
+
+class SlidingPuzzleState:
+    """
+    An N x N puzzle with the methods of EightPuzzleState.  numbers lists the
+    tiles row by row with 0 for the blank; the side is the square root of
+    its length.
+
+    >>> SlidingPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left').isGoal()
+    True
+    """
+
+    def __init__(self, numbers):
+        side = int(round(len(numbers) ** 0.5))
+        if side * side != len(numbers) or sorted(numbers) != list(range(len(numbers))):
+            raise Exception('A puzzle needs a square number of distinct tiles from 0 up')
+        self.puzzle = getSlidingPuzzle(side)
+        self.state = self.puzzle.pack(numbers)
+
+    @staticmethod
+    def fromState(side, state):
+        "Wraps a packed state of an N x N puzzle."
+        puzzleState = SlidingPuzzleState.__new__(SlidingPuzzleState)
+        puzzleState.puzzle = getSlidingPuzzle(side)
+        puzzleState.state = state
+        return puzzleState
+
+    @property
+    def blankLocation(self):
+        return divmod(self.puzzle.blank(self.state), self.puzzle.side)
+
+    def isGoal(self):
+        return self.state == self.puzzle.goal
+
+    def legalMoves(self):
+        """
+        >>> SlidingPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
+        ['down', 'right']
+        """
+        return [entry[0] for entry in self.puzzle.moves[self.puzzle.blank(self.state)]]
+
+    def result(self, move):
+        "Returns a new puzzle after a move; this one is not changed."
+        return SlidingPuzzleState.fromState(self.puzzle.side, self.puzzle.result(self.state, move))
+
+    def getTiles(self):
+        return self.puzzle.unpack(self.state)
+
+    def __eq__(self, other):
+        return isinstance(other, SlidingPuzzleState) and self.state == other.state
+
+    def __hash__(self):
+        return hash(self.state)
+
+    def __str__(self):
+        side, tiles = self.puzzle.side, self.getTiles()
+        width = len(str(self.puzzle.cells - 1))
+        horizontalLine = '-' * ((width + 3) * side + 1)
+        lines = [horizontalLine]
+        for row in range(side):
+            cells = [str(tile).rjust(width) if tile else ' ' * width
+                     for tile in tiles[row * side:(row + 1) * side]]
+            lines.append('| ' + ' | '.join(cells) + ' |')
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+    A SearchProblem over the packed int states of an N x N puzzle, starting
+    from a SlidingPuzzleState (or an EightPuzzleState).  Actions are the
+    moves of the blank, each costing 1.
+    """
+
+    def __init__(self, puzzle):
+        tiles = puzzle.getTiles()
+        self.side = int(round(len(tiles) ** 0.5))
+        self.puzzle = getSlidingPuzzle(self.side)
+        self.start = self.puzzle.pack(tiles)
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, state):
+        return state == self.puzzle.goal
+
+    def getSuccessors(self, state):
+        self._expanded += 1
+        return self.puzzle.successors(state)
+
+    def getCostOfActions(self, actions):
+        state = self.start
+        for action in actions:
+            state = self.puzzle.result(state, action)
+        return len(actions)
+
+    def getTiles(self, state):
+        "Returns the tiles of a state row by row, for pattern database heuristics."
+        return self.puzzle.unpack(state)
+
+
+def manhattanPuzzleHeuristic(state, problem):
+    "The sum of the Manhattan distances of the tiles from their goal cells."
+    side = problem.side
+    distance = 0
+    for cell, tile in enumerate(problem.getTiles(state)):
+        if tile:
+            distance += abs(cell // side - tile // side) + abs(cell % side - tile % side)
+    return distance
+
+_patternHeuristics = {}
+
+def patternPuzzleHeuristic(state, problem):
+    """
+    The default additive pattern databases of the puzzle's size (see
+    patternDatabase.py), built on first use.  Sizes without a default
+    partition fall back to manhattanPuzzleHeuristic.
+    """
+    if problem.side not in DEFAULT_PARTITIONS:
+        return manhattanPuzzleHeuristic(state, problem)
+    if problem.side not in _patternHeuristics:
+        _patternHeuristics[problem.side] = AdditivePatternHeuristic(problem.side)
+    return _patternHeuristics[problem.side](state, problem)
+
+
+def createRandomPuzzle(side, moves=100):
+    """
+    Creates a random N x N puzzle by applying 'moves' random moves to a
+    solved one.
+    """
+    puzzle = getSlidingPuzzle(side)
+    state = puzzle.goal
+    for i in range(moves):
+        state = random.choice(puzzle.successors(state))[0]
+    return SlidingPuzzleState.fromState(side, state)
+
+
+HEURISTICS = {'null': search.nullHeuristic, 'manhattan': manhattanPuzzleHeuristic,
+              'pattern': patternPuzzleHeuristic}
+
+def readCommand(argv):
+    usageStr = """
+    USAGE:      python slidingPuzzle.py <options>
+    EXAMPLES:   (1) python slidingPuzzle.py -s 3 -m 100 -n 20
+                    - solves 20 random eight puzzles with A* and pattern databases
+                (2) python slidingPuzzle.py -s 5 -m 40 -f ida -H manhattan
+                    - solves a twenty-four puzzle with IDA*
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-s', '--side', dest='side', type='int', default=3,
+                      help='side length of the puzzle (default: %default)')
+    parser.add_option('-m', '--moves', dest='moves', type='int', default=100,
+                      help='random moves applied to each puzzle (default: %default)')
+    parser.add_option('-n', '--number', dest='number', type='int', default=1,
+                      help='number of puzzles to solve (default: %default)')
+    parser.add_option('-f', '--fn', dest='fn', default='astar',
+                      help='search function from search.py (default: %default)')
+    parser.add_option('-H', '--heuristic', dest='heuristic', default='pattern',
+                      help='one of %s (default: %%default)' % ', '.join(sorted(HEURISTICS)))
+    parser.add_option('-r', '--seed', dest='seed', type='int', default=None,
+                      help='random seed')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    random.seed(options.seed)
+    searchFunction = getattr(search, options.fn)
+    heuristic = HEURISTICS[options.heuristic]
+    if 'heuristic' not in searchFunction.__code__.co_varnames:
+        heuristic = None
+    for i in range(options.number):
+        puzzle = createRandomPuzzle(options.side, options.moves)
+        problem = SlidingPuzzleSearchProblem(puzzle)
+        actions, stats = search.runSearch(searchFunction, problem, heuristic)
+        print('Puzzle %d: %d moves, %s' % (i, len(actions), stats))
@@ -21,6 +21,7 @@
 # For more info, see http://inst.eecs.berkeley.edu/~cs188/sp09/pacman.html
 
 from util import *
+import random
 import time
 import os
 import traceback
@@ -393,19 +394,79 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+class ZobristKeys:
+    """
+    Random 64-bit keys for the parts of a game state: each agent's
+    configuration and scared timer, each food cell and each capsule.  The
+    Zobrist hash of a state is the xor of the keys of its parts, so a move
+    updates it by xoring out the keys of what changed and xoring in their
+    new keys.
+
+    Keys are drawn on first use from a generator of their own, so seeded
+    games play out the same with or without hashing.
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.keys = {}
+
+    def key(self, part):
+        value = self.keys.get(part)
+        if value is None:
+            value = self.keys[part] = self.random.getrandbits(64)
+        return value
+
+    def agentKey(self, index, agentState):
+        configuration = agentState.configuration
+        return self.key((index, configuration.pos, configuration.direction, agentState.scaredTimer))
+
+    def foodKey(self, position):
+        return self.key(('food', position))
+
+    def capsuleKey(self, position):
+        return self.key(('capsule', position))
+
+    def hashState(self, data):
+        "The Zobrist hash of a GameStateData, computed from scratch."
+        hash = 0
+        for index, agentState in enumerate(data.agentStates):
+            hash ^= self.agentKey(index, agentState)
+        for position in data.food.asList():
+            hash ^= self.foodKey(position)
+        for position in data.capsules:
+            hash ^= self.capsuleKey(position)
+        return hash
+
+ZOBRIST_KEYS = ZobristKeys()
+
+
 class GameStateData:
+    """
+    The data of a GameState.  A successor's data shares the food grid, the
+    capsule list, the _eaten list and the agent states with its
+    predecessor's; the rules replace them with copies before writing
+    (copy on write), so generating a successor copies only what changes.
+    Use getWritableAgentState to change an agent state in place.
+
+    zobrist holds the Zobrist hash of the agent states, food and capsules
+    (see ZobristKeys), which generateSuccessor keeps up to date with
+    updateZobrist; __hash__ combines it with the score.
+    """
 
     def __init__(self, prevState=None):
         """
         Generates a new data packet by copying information from its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
+            # bit i is set once agentStates[i] is this packet's own copy
+            self._ownedAgents = 0
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self.zobrist = prevState.zobrist
 
         self._foodEaten = None
         self._foodAdded = None
@@ -418,6 +479,10 @@ class GameStateData:
     def deepCopy(self):
         state = GameStateData(self)
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates(self.agentStates)
+        state._ownedAgents = -1
+        state._eaten = self._eaten[:]
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -431,6 +496,37 @@ class GameStateData:
             copiedStates.append(agentState.copy())
         return copiedStates
 
+    def getWritableAgentState(self, index):
+        """
+        Returns agentStates[index] for changing in place, copying it first
+        if it is still shared with the predecessor.
+        """
+        if not self._ownedAgents & (1 << index):
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownedAgents |= 1 << index
+        return self.agentStates[index]
+
+    def updateZobrist(self, prevState):
+        """
+        Updates zobrist after the rules changed this packet, generated from
+        prevState: only the agent states copied for writing, the food eaten
+        and the capsule eaten can differ.
+        """
+        keys = ZOBRIST_KEYS
+        hash = prevState.zobrist
+        owned = self._ownedAgents
+        index = 0
+        while owned:
+            if owned & 1:
+                hash ^= keys.agentKey(index, prevState.agentStates[index]) ^ keys.agentKey(index, self.agentStates[index])
+            owned >>= 1
+            index += 1
+        if self._foodEaten != None:
+            hash ^= keys.foodKey(self._foodEaten)
+        if self._capsuleEaten != None:
+            hash ^= keys.capsuleKey(self._capsuleEaten)
+        self.zobrist = hash
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -452,13 +548,7 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575)
+        return self.zobrist ^ hash(self.score)
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
@@ -535,7 +625,9 @@ class GameStateData:
                     numGhosts += 1
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
+        self._ownedAgents = -1
         self._eaten = [False for a in self.agentStates]
+        self.zobrist = ZOBRIST_KEYS.hashState(self)
 
 
 try:
@@ -14,7 +14,10 @@
 import math
 from util import manhattanDistance
 from game import Directions
+from distanceCalculator import getDistanceOracle
+import collections
 import random, util
+import time
 
 from game import Agent
 
@@ -120,6 +123,165 @@ def scoreEvaluationFunction(currentGameState):
     """
     return currentGameState.getScore()
 
+# entries kept by a TranspositionTable unless told otherwise
+DEFAULT_TABLE_SIZE = 100000
+
+class TranspositionTable:
+    """
+    A bounded table of search results, keyed by a game state's hash and the
+    agent to move (see MultiAgentSearchAgent.nodeKey).  An entry holds the
+    value found for the node, the depth it was searched to, whether the
+    value is exact or only a lower or upper bound (alpha-beta cut the
+    search short), and the best action found.  Once maxSize entries are
+    stored, the least recently used one is dropped.
+    """
+    EXACT, LOWER, UPPER = 'exact', 'lower', 'upper'
+
+    def __init__(self, maxSize=DEFAULT_TABLE_SIZE):
+        self.maxSize = maxSize
+        self.entries = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def lookup(self, key):
+        "Returns the (value, depth, bound, action) entry of key, or None."
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, value, depth, bound, action):
+        "Stores a result, unless the table holds one searched deeper."
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > depth:
+            return
+        self.entries[key] = (value, depth, bound, action)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        total = self.hits + self.misses
+        return '%d entries, %d hits in %d lookups (%.1f%%)' % (
+            len(self.entries), self.hits, total, 100.0 * self.hits / total if total else 0.0)
+
+
+class SearchTimeout(Exception):
+    "Raised by makeMove once the time budget of an iterative deepening search is spent."
+    pass
+
+# deepest search tried by iterative deepening, for endgames that run out of moves
+MAX_DEEPENING_DEPTH = 50
+
+class MoveOrdering:
+    """
+    Orders the actions of alpha-beta nodes so that the ones likely to cut
+    the search short come first, and counts the nodes visited and the
+    actions pruned.  strategies lists any of:
+
+      'killer':     actions that caused a cutoff at the same ply from the
+                    root during the search of the current root position,
+                    most recent first
+      'history':    actions by how often they caused a cutoff for the agent
+                    from the same position, weighted by depth squared
+      'evaluation': actions by the evaluation of their successor, best for
+                    the agent to move first (costs a successor per action)
+
+    Earlier strategies take precedence; later ones break ties.  Without
+    strategies the order of getLegalActions is kept.
+    """
+    STRATEGIES = ['killer', 'history', 'evaluation']
+
+    def __init__(self, strategies=(), killerSlots=2):
+        for strategy in strategies:
+            if strategy not in MoveOrdering.STRATEGIES:
+                raise Exception('Unknown move ordering: ' + strategy)
+        self.strategies = list(strategies)
+        self.killerSlots = killerSlots
+        self.reset()
+
+    def reset(self):
+        "Forgets the killers, the history and the counts."
+        self.startSearch()
+        self.history = util.Counter()
+        self.nodes = self.expanded = self.cutoffs = self.pruned = 0
+
+    def startSearch(self):
+        "Forgets the killers before searching a new root position."
+        self.killers = {}
+        self.rootDepth = 0
+
+    def ply(self, depth, agentIndex):
+        """
+        The ply of a node from the root, as (full turns, agent), given its
+        remaining depth.  Set rootDepth to the depth of each root search.
+        """
+        return self.rootDepth - depth, agentIndex
+
+    def visit(self):
+        self.nodes += 1
+
+    def expand(self, actions):
+        self.expanded += len(actions)
+
+    def order(self, agent, gameState, agentIndex, depth, actions):
+        """
+        Sorts actions by the strategies and returns them.  agent supplies
+        the evaluation function and makeMove/unmakeMove.
+        """
+        if not self.strategies or len(actions) < 2:
+            return actions
+        keys = dict((action, []) for action in actions)
+        for strategy in self.strategies:
+            if strategy == 'killer':
+                killers = self.killers.get(self.ply(depth, agentIndex), [])
+                for action in actions:
+                    keys[action].append(killers.index(action) if action in killers else len(killers))
+            elif strategy == 'history':
+                position = self.position(gameState, agentIndex)
+                for action in actions:
+                    keys[action].append(-self.history[(agentIndex, position, action)])
+            elif strategy == 'evaluation':
+                # pacman wants high values, the ghosts low ones
+                sign = -1 if agentIndex == 0 else 1
+                for action in actions:
+                    successor, undo = agent.makeMove(gameState, agentIndex, action)
+                    keys[action].append(sign * agent.evaluationFunction(successor))
+                    agent.unmakeMove(successor, undo)
+        return sorted(actions, key=lambda action: keys[action])
+
+    def cutoff(self, gameState, agentIndex, depth, action, actions):
+        "Records that action cut the search of a node with these ordered actions."
+        self.cutoffs += 1
+        self.pruned += len(actions) - actions.index(action) - 1
+        if 'killer' in self.strategies:
+            killers = self.killers.setdefault(self.ply(depth, agentIndex), [])
+            if action in killers:
+                killers.remove(action)
+            killers.insert(0, action)
+            del killers[self.killerSlots:]
+        if 'history' in self.strategies:
+            self.history[(agentIndex, self.position(gameState, agentIndex), action)] += depth * depth
+
+    def position(self, gameState, agentIndex):
+        if agentIndex == 0:
+            return gameState.getPacmanPosition()
+        return gameState.getGhostPosition(agentIndex)
+
+    def pruneRate(self):
+        "The share of the actions of expanded nodes that were never searched."
+        return float(self.pruned) / self.expanded if self.expanded else 0.0
+
+    def __str__(self):
+        return '%d nodes, %d cutoffs, %.1f%% of actions pruned' % (
+            self.nodes, self.cutoffs, 100.0 * self.pruneRate())
+
+
 class MultiAgentSearchAgent(Agent):
     """
     This class provides some common elements to all of your
@@ -135,10 +297,153 @@ class MultiAgentSearchAgent(Agent):
     is another abstract class.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', inPlace = 'False', tableSize = '0',
+                 timeLimit = '0'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        # search on one state with apply/undo instead of generating successors
+        self.inPlace = inPlace not in [False, 'False', 'false', '0']
+        # results kept across plies and getAction calls, if tableSize is set
+        self.transpositions = TranspositionTable(int(tableSize)) if int(tableSize) > 0 else None
+        # seconds per move for iterative deepening, which then replaces depth;
+        # keep it well below the game's move timeout (--timeout)
+        self.timeLimit = float(timeLimit)
+        self.deadline = None
+        # best action of every node searched by the current deepening iteration
+        self.bestMoves = None
+        # node key -> action along the last completed iteration's principal variation
+        self.principalVariation = {}
+
+    def searchState(self, gameState):
+        """
+        The state getAction searches from: with inPlace set, an
+        UndoableGameState copy of gameState (pacman.py) that makeMove changes
+        in place, otherwise gameState itself.
+        """
+        if self.inPlace and hasattr(gameState, 'undoableCopy'):
+            return gameState.undoableCopy()
+        return gameState
+
+    def makeMove(self, gameState, agentIndex, action):
+        """
+        Returns the state after the agent takes the action, and a record for
+        unmakeMove.  An UndoableGameState is changed in place and returned
+        itself; any other state generates a successor.
+        """
+        if self.deadline != None and time.time() > self.deadline:
+            raise SearchTimeout()
+        if hasattr(gameState, 'apply'):
+            return gameState, gameState.apply(agentIndex, action)
+        return gameState.generateSuccessor(agentIndex, action), None
+
+    def unmakeMove(self, gameState, record):
+        "Undoes a makeMove on the state it returned."
+        if record != None:
+            gameState.undo(record)
+
+    def nodeKey(self, gameState, agentIndex):
+        return hash(gameState), agentIndex
+
+    def orderActions(self, gameState, agentIndex, depth=None):
+        """
+        The legal actions of an agent in the order to search them: the
+        principal variation's action first when the node lies on it, the
+        order of getLegalActions otherwise.  depth is the node's remaining
+        depth, for agents that order by more than that.
+        """
+        actions = gameState.getLegalActions(agentIndex)
+        if self.principalVariation:
+            best = self.principalVariation.get(self.nodeKey(gameState, agentIndex))
+            if best in actions:
+                actions = [best] + [action for action in actions if action != best]
+        return actions
+
+    def deepen(self, gameState, search):
+        """
+        Returns search(gameState, depth), the action found by a search of
+        the given depth.  With a timeLimit, searches depth 1, 2, 3, ... until
+        the time is spent, each ordered by the principal variation of the one
+        before, and returns the action of the deepest completed search.  Depth
+        1 is always searched to the end, so there is always an action.
+        """
+        if self.timeLimit <= 0:
+            return search(gameState, self.depth)
+        start = time.time()
+        self.principalVariation = {}
+        action = None
+        try:
+            for depth in range(1, MAX_DEEPENING_DEPTH + 1):
+                self.bestMoves = {}
+                action = search(gameState, depth)
+                self.principalVariation = self.extractVariation(gameState)
+                self.deadline = start + self.timeLimit
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+            self.bestMoves = None
+        return action
+
+    def extractVariation(self, gameState):
+        """
+        Follows the best moves of the last search from gameState and returns
+        the node key -> action table of that principal variation.
+        """
+        variation = {}
+        state = self.searchState(gameState)
+        agentIndex = 0
+        key = self.nodeKey(state, agentIndex)
+        undos = []
+        while key in self.bestMoves and key not in variation and self.bestMoves[key] != None:
+            variation[key] = self.bestMoves[key]
+            if state.isWin() or state.isLose():
+                break
+            state, undo = self.makeMove(state, agentIndex, variation[key])
+            undos.append((state, undo))
+            agentIndex = (agentIndex + 1) % state.getNumAgents()
+            key = self.nodeKey(state, agentIndex)
+        for state, undo in reversed(undos):
+            self.unmakeMove(state, undo)
+        return variation
+
+    def lookupResult(self, gameState, agentIndex, depth, alpha=None, beta=None):
+        """
+        Returns the (value, action) stored for a node if it was searched at
+        least depth deep and settles the node's value, or None.  With an
+        alpha-beta window a bound settles it when it falls outside the
+        window.  Without a transposition table this is always None.
+        """
+        if self.transpositions == None:
+            return None
+        entry = self.transpositions.lookup(self.nodeKey(gameState, agentIndex))
+        if entry is None or entry[1] < depth:
+            return None
+        value, _, bound, action = entry
+        if bound == TranspositionTable.EXACT or \
+                (bound == TranspositionTable.LOWER and beta != None and value >= beta) or \
+                (bound == TranspositionTable.UPPER and alpha != None and value <= alpha):
+            if self.bestMoves != None:
+                self.bestMoves[self.nodeKey(gameState, agentIndex)] = action
+            return value, action
+        return None
+
+    def storeResult(self, gameState, agentIndex, depth, value, action, alpha=None, beta=None):
+        """
+        Stores the result of a node in the transposition table, if any, and
+        its best action for the principal variation of a deepening search.
+        alpha and beta are the window the node was searched with, if any.
+        """
+        if self.bestMoves != None:
+            self.bestMoves[self.nodeKey(gameState, agentIndex)] = action
+        if self.transpositions == None:
+            return
+        bound = TranspositionTable.EXACT
+        if alpha != None and value <= alpha:
+            bound = TranspositionTable.UPPER
+        elif beta != None and value >= beta:
+            bound = TranspositionTable.LOWER
+        self.transpositions.store(self.nodeKey(gameState, agentIndex), value, depth, bound, action)
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -174,49 +479,90 @@ class MinimaxAgent(MultiAgentSearchAgent):
         def minimizer(gameState, depth, agentIndex):
             if end(gameState, depth):
                 return self.evaluationFunction(gameState)
+            stored = self.lookupResult(gameState, agentIndex, depth)
+            if stored != None:
+                return stored[0]
 
             minVal = 999999
-            for _ in gameState.getLegalActions(agentIndex):
+            action = None
+            for _ in self.orderActions(gameState, agentIndex):
                 # recursive call
                 # update minimum boundary
+                successor, undo = self.makeMove(gameState, agentIndex, _)
                 if agentIndex == agentNumber - 1:
                     # pacman turn update depth after a full turn
-                    result = maximizer(gameState.generateSuccessor(agentIndex, _), depth - 1, 0)[0]
+                    result = maximizer(successor, depth - 1, 0)[0]
                 else:
-                    result = minimizer(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1)
+                    result = minimizer(successor, depth, agentIndex + 1)
+                self.unmakeMove(successor, undo)
 
                 if result < minVal:
                     minVal = result
+                    action = _
 
+            self.storeResult(gameState, agentIndex, depth, minVal, action)
             return minVal
 
         def maximizer(gameState, depth, agentIndex):
             if end(gameState, depth):
                 return self.evaluationFunction(gameState), None
+            stored = self.lookupResult(gameState, agentIndex, depth)
+            if stored != None:
+                return stored
 
             maxVal = -999999
             action = None
-            for _ in gameState.getLegalActions(agentIndex):
+            for _ in self.orderActions(gameState, agentIndex):
                 # update maximum boundary
-                result = minimizer(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1)
+                successor, undo = self.makeMove(gameState, agentIndex, _)
+                result = minimizer(successor, depth, agentIndex + 1)
+                self.unmakeMove(successor, undo)
                 if result > maxVal:
                     maxVal = result
                     action = _
 
+            self.storeResult(gameState, agentIndex, depth, maxVal, action)
             return maxVal, action
 
         def end(gameState, depth):
             return gameState.isWin() or gameState.isLose() or depth <= 0
 
-        return maximizer(gameState, self.depth, 0)[1]
+        return self.deepen(gameState, lambda gameState, depth: maximizer(self.searchState(gameState), depth, 0)[1])
         # util.raiseNotDefined()
 
 
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
     Your minimax agent with alpha-beta pruning (question 3)
+
+    ordering names the MoveOrdering strategies to use, joined by '+', e.g.
+    -a ordering=killer+history+evaluation; with showStats the node and
+    prune counts are printed at the end of each game.  Killers, history and
+    counts start afresh with every game.
     """
 
+    def __init__(self, ordering = '', showStats = 'False', **args):
+        MultiAgentSearchAgent.__init__(self, **args)
+        self.ordering = MoveOrdering([strategy for strategy in ordering.split('+') if strategy])
+        self.showStats = showStats not in [False, 'False', 'false', '0']
+
+    def orderActions(self, gameState, agentIndex, depth=None):
+        actions = MultiAgentSearchAgent.orderActions(self, gameState, agentIndex)
+        # the principal variation's action stays first
+        first = 0
+        if self.principalVariation and actions[0] == self.principalVariation.get(self.nodeKey(gameState, agentIndex)):
+            first = 1
+        actions = actions[:first] + self.ordering.order(self, gameState, agentIndex, depth, actions[first:])
+        self.ordering.expand(actions)
+        return actions
+
+    def registerInitialState(self, state):
+        self.ordering.reset()
+
+    def final(self, state):
+        if self.showStats:
+            print('AlphaBetaAgent: %s' % self.ordering)
+
     def getAction(self, gameState):
         """
         Returns the minimax action using self.depth and self.evaluationFunction
@@ -225,38 +571,59 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         agentNumber = gameState.getNumAgents()
 
         def minimizer(gameState, depth, agentIndex, alpha, beta):
+            self.ordering.visit()
             if end(gameState, depth):
                 return self.evaluationFunction(gameState)
+            stored = self.lookupResult(gameState, agentIndex, depth, alpha, beta)
+            if stored != None:
+                return stored[0]
 
             minVal = 999999
-            for _ in gameState.getLegalActions(agentIndex):
+            action = None
+            window = alpha, beta
+            actions = self.orderActions(gameState, agentIndex, depth)
+            for _ in actions:
                 # recursive call
                 # update minimum boundary
+                successor, undo = self.makeMove(gameState, agentIndex, _)
                 if agentIndex == agentNumber - 1:
                     # pacman turn update depth after a full turn
-                    result = maximizer(gameState.generateSuccessor(agentIndex, _), depth - 1, 0, alpha, beta)[0]
+                    result = maximizer(successor, depth - 1, 0, alpha, beta)[0]
                 else:
-                    result = minimizer(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1, alpha, beta)
+                    result = minimizer(successor, depth, agentIndex + 1, alpha, beta)
+                self.unmakeMove(successor, undo)
 
                 # prune
                 if result < minVal:
                     minVal = result
+                    action = _
                 if result < alpha:
+                    self.ordering.cutoff(gameState, agentIndex, depth, _, actions)
+                    self.storeResult(gameState, agentIndex, depth, result, action, *window)
                     return result
                 # update beta
                 beta = min(beta, minVal)
 
+            self.storeResult(gameState, agentIndex, depth, minVal, action, *window)
             return minVal
 
         def maximizer(gameState, depth, agentIndex, alpha, beta):
+            self.ordering.visit()
             if end(gameState, depth):
                 return self.evaluationFunction(gameState), None
+            stored = self.lookupResult(gameState, agentIndex, depth, alpha, beta)
+            if stored != None:
+                return stored
 
             maxVal = -999999
             action = None
-            for _ in gameState.getLegalActions(agentIndex):
+            window = alpha, beta
+            actions = self.orderActions(gameState, agentIndex, depth)
+            for _ in actions:
                 # update maximum boundary
-                minimizer_result = minimizer(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1, alpha, beta)
+                successor, undo = self.makeMove(gameState, agentIndex, _)
+                minimizer_result = minimizer(successor, depth, agentIndex + 1, alpha, beta)
+                self.unmakeMove(successor, undo)
 
                 if minimizer_result > maxVal:
                     maxVal = minimizer_result
@@ -264,9 +631,12 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
 
                 # prune
                 if minimizer_result > beta:
+                    self.ordering.cutoff(gameState, agentIndex, depth, _, actions)
+                    self.storeResult(gameState, agentIndex, depth, minimizer_result, action, *window)
                     return minimizer_result, action
                 alpha = max(alpha, maxVal)
 
+            self.storeResult(gameState, agentIndex, depth, maxVal, action, *window)
             return maxVal, action
 
         def end(gameState, depth):
@@ -276,7 +646,13 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         alpha = -999999
         beta = 999999
 
-        return maximizer(gameState, self.depth, 0, alpha, beta)[1]
+        def search(gameState, depth):
+            # killers are kept by ply, which depends on the root depth
+            self.ordering.rootDepth = depth
+            return maximizer(self.searchState(gameState), depth, 0, alpha, beta)[1]
+
+        self.ordering.startSearch()
+        return self.deepen(gameState, search)
         # util.raiseNotDefined()
 
 class ExpectimaxAgent(MultiAgentSearchAgent):
@@ -297,39 +673,51 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         def maximizer(gameState, depth, agentIndex):
             if end(gameState, depth):
                 return self.evaluationFunction(gameState), None
+            stored = self.lookupResult(gameState, agentIndex, depth)
+            if stored != None:
+                return stored
 
             maxVal = -999999
             action = None
-            for _ in gameState.getLegalActions(agentIndex):
+            for _ in self.orderActions(gameState, agentIndex):
                 # update maximum boundary
-                result = expectVal(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1)
+                successor, undo = self.makeMove(gameState, agentIndex, _)
+                result = expectVal(successor, depth, agentIndex + 1)
+                self.unmakeMove(successor, undo)
                 if result > maxVal:
                     maxVal = result
                     action = _
 
+            self.storeResult(gameState, agentIndex, depth, maxVal, action)
             return maxVal, action
 
         def expectVal(gameState, depth, agentIndex):
             if end(gameState, depth):
                 return self.evaluationFunction(gameState)
+            stored = self.lookupResult(gameState, agentIndex, depth)
+            if stored != None:
+                return stored[0]
 
             value = 0
-            actions = gameState.getLegalActions(agentIndex)
+            actions = self.orderActions(gameState, agentIndex)
             for _ in actions:
                 # recursive call
                 # update minimum boundary
+                successor, undo = self.makeMove(gameState, agentIndex, _)
                 if agentIndex == agentNumber - 1:
                     # pacman turn update depth after a full turn
-                    value += maximizer(gameState.generateSuccessor(agentIndex, _), depth - 1, 0)[0] / len(actions)
+                    value += maximizer(successor, depth - 1, 0)[0] / len(actions)
                 else:
-                    value += expectVal(gameState.generateSuccessor(agentIndex, _), depth, agentIndex + 1) / len(actions)
+                    value += expectVal(successor, depth, agentIndex + 1) / len(actions)
+                self.unmakeMove(successor, undo)
 
+            self.storeResult(gameState, agentIndex, depth, value, None)
             return value
 
         def end(gameState, depth):
             return gameState.isWin() or gameState.isLose() or depth <= 0
 
-        return maximizer(gameState, self.depth, 0)[1]
+        return self.deepen(gameState, lambda gameState, depth: maximizer(self.searchState(gameState), depth, 0)[1])
         # util.raiseNotDefined()
 
 
@@ -342,7 +730,7 @@ def betterEvaluationFunction(currentGameState):
     evaluation function (question 5).
 
     DESCRIPTION: <write something here so we know what you did>
-    calculate the manhattan distance from current pos to food (weight 2), to ghost (weight -1) and scared ghost
+    calculate the maze distance from current pos to food (weight 2), to ghost (weight -1) and scared ghost
     (weight 4) for score bonus. The evaluation value basis is the current score to avoid pacman playing passive also
     indicates the current position has food. And if the ghosts are scared, basically can neglect its influence on
     current state evaluation. Use of natural log neglect the ghost effect when far away, but exponential when nearby.
@@ -357,25 +745,28 @@ def betterEvaluationFunction(currentGameState):
     capsulePos = currentGameState.getCapsules()
     newGhostPos = [_.getPosition() for _ in currentGhostStates]
     value = currentGameState.getScore()
+    # maze distances from the layout's shared distance oracle
+    distances = getDistanceOracle(currentGameState.data.layout)
 
     # food distance
     foodDistance = [((0, 0), 999999)]  # fail safe
     # dotDistance = [((0, 0), 999999)]
     for food in foodPos:
-        foodDistance.append((food, manhattanDistance(currentPos, food)))
+        foodDistance.append((food, distances.distance(currentPos, food)))
         # dotDistance.append((food, manhattanDistance(currentPos, food)))
     for capsule in capsulePos:
         # given a bit of priority
-        foodDistance.append((capsule, manhattanDistance(currentPos, capsule) / 0.2))
+        foodDistance.append((capsule, distances.distance(currentPos, capsule) / 0.2))
 
     # ghost distance
     ghostDistance = [999999]  # fail safe
     for ghostIndex in range(len(newGhostPos)):
-        ghostPos = newGhostPos[ghostIndex]
+        # scared ghosts move at half speed and can sit between two cells
+        ghostPos = util.nearestPoint(newGhostPos[ghostIndex])
         if currentScaredTimes[ghostIndex] <= 2:
-            ghostDistance.append(manhattanDistance(currentPos, ghostPos))
+            ghostDistance.append(distances.distance(currentPos, ghostPos))
         else:
-            foodDistance.append((ghostPos, manhattanDistance(currentPos, ghostPos) / 2))
+            foodDistance.append((ghostPos, distances.distance(currentPos, ghostPos) / 2))
 
     foodDistance = sorted(foodDistance, key=lambda _: _[1])
     '''
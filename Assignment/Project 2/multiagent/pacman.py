@@ -43,6 +43,8 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
+from game import ZOBRIST_KEYS
 from util import nearestPoint
 from util import manhattanDistance
 import util
@@ -112,7 +114,8 @@ class GameState:
 
         # Let agent's logic deal with its action's effects on the board
         if agentIndex == 0:  # Pacman is moving
-            state.data._eaten = [False for i in range(state.getNumAgents())]
+            if True in state.data._eaten:
+                state.data._eaten = [False for i in range(state.getNumAgents())]
             PacmanRules.applyAction(state, action)
         else:                # A ghost is moving
             GhostRules.applyAction(state, action, agentIndex)
@@ -129,6 +132,7 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
+        state.data.updateZobrist(self.data)
         GameState.explored.add(self)
         GameState.explored.add(state)
         return state
@@ -240,6 +244,13 @@ class GameState:
         state.data = self.data.deepCopy()
         return state
 
+    def undoableCopy(self):
+        """
+        Returns an UndoableGameState copy of this state, for searches that
+        apply and undo moves in place.
+        """
+        return UndoableGameState(self)
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -262,6 +273,167 @@ class GameState:
         """
         self.data.initialize(layout, numGhostAgents)
 
+class UndoableGameState(GameState):
+    """
+    A GameState that a depth-first search changes in place instead of
+    generating a new state per node:
+
+      record = state.apply(agentIndex, action)
+      ...                     # state is now the successor
+      state.undo(record)      # state is exactly as before
+
+    apply follows the same rules as generateSuccessor (movement, food and
+    capsules eaten, scared timers, collisions, score and win/lose) but
+    does not check that the action is legal, and does not add states to
+    GameState.explored.  Undo records must be undone in reverse order.
+
+    The state owns its food grid, capsule list and agent states, and keeps
+    its food count up to date.  generateSuccessor still works and returns
+    an ordinary GameState that shares nothing with this one.
+    """
+
+    def __init__(self, gameState):
+        data = gameState.data
+        self.data = GameStateData(data)
+        self.data.food = data.food.copy()
+        self.data.capsules = data.capsules[:]
+        self.data.agentStates = self.data.copyAgentStates(data.agentStates)
+        self.data._ownedAgents = -1
+        self.data._eaten = data._eaten[:]
+        self.data._foodEaten = data._foodEaten
+        self.data._capsuleEaten = data._capsuleEaten
+        self.data._agentMoved = data._agentMoved
+        self.data._win, self.data._lose = data._win, data._lose
+        self.data.scoreChange = data.scoreChange
+        self.numFood = data.food.count()
+
+    def getNumFood(self):
+        return self.numFood
+
+    def apply(self, agentIndex, action):
+        """
+        Changes this state into its successor after the agent takes the
+        action and returns the record that undoes it.
+        """
+        data = self.data
+        if data._win or data._lose:
+            raise Exception('Can\'t generate a successor of a terminal state.')
+        agentStates = data.agentStates
+        # (index, configuration, scaredTimer) of each agent state before it changed
+        changed = []
+        eatenFood = None
+        eatenCapsule = None
+        record = (agentIndex, changed, data.score, data.scoreChange, data._win, data._lose,
+                  data._eaten, data._foodEaten, data._capsuleEaten, data._agentMoved, data.zobrist)
+        data.scoreChange = 0
+        data._foodEaten = None
+        data._capsuleEaten = None
+
+        agentState = agentStates[agentIndex]
+        changed.append((agentIndex, agentState.configuration, agentState.scaredTimer))
+        if agentIndex == 0:  # Pacman is moving
+            if True in data._eaten:
+                data._eaten = [False for i in range(len(agentStates))]
+            vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
+            agentState.configuration = agentState.configuration.generateSuccessor(vector)
+            position = agentState.configuration.getPosition()
+            nearest = nearestPoint(position)
+            if manhattanDistance(nearest, position) <= 0.5:
+                eatenFood, eatenCapsule = self._consume(nearest, changed)
+            data.scoreChange += -TIME_PENALTY
+            # anyone can kill Pacman
+            for index in range(1, len(agentStates)):
+                ghostState = agentStates[index]
+                if GhostRules.canKill(position, ghostState.configuration.getPosition()):
+                    changed.append((index, ghostState.configuration, ghostState.scaredTimer))
+                    GhostRules.collide(self, ghostState, index)
+        else:                # A ghost is moving
+            speed = GhostRules.GHOST_SPEED
+            if agentState.scaredTimer > 0:
+                speed /= 2.0
+            vector = Actions.directionToVector(action, speed)
+            agentState.configuration = agentState.configuration.generateSuccessor(vector)
+            GhostRules.decrementTimer(agentState)
+            GhostRules.checkDeath(self, agentIndex)
+
+        data._agentMoved = agentIndex
+        data.score += data.scoreChange
+        self._updateZobrist(changed, eatenFood, eatenCapsule)
+        return record + (eatenFood, eatenCapsule)
+
+    def _updateZobrist(self, changed, eatenFood, eatenCapsule):
+        "Updates the Zobrist hash after apply, like GameStateData.updateZobrist."
+        data = self.data
+        hash = data.zobrist
+        updated = 0
+        for index, configuration, scaredTimer in changed:
+            if updated & (1 << index):
+                continue
+            updated |= 1 << index
+            hash ^= ZOBRIST_KEYS.key((index, configuration.pos, configuration.direction, scaredTimer))
+            hash ^= ZOBRIST_KEYS.agentKey(index, data.agentStates[index])
+        if eatenFood != None:
+            hash ^= ZOBRIST_KEYS.foodKey(eatenFood)
+        if eatenCapsule != None:
+            hash ^= ZOBRIST_KEYS.capsuleKey(eatenCapsule[1])
+        data.zobrist = hash
+
+    def _consume(self, position, changed):
+        "Eats the food or capsule at position; returns (food, (index, capsule)) eaten."
+        data = self.data
+        x, y = position
+        eatenFood = eatenCapsule = None
+        if data.food[x][y]:
+            data.scoreChange += 10
+            data.food[x][y] = False
+            data._foodEaten = eatenFood = position
+            self.numFood -= 1
+            if self.numFood == 0 and not data._lose:
+                data.scoreChange += 500
+                data._win = True
+        if position in data.capsules:
+            index = data.capsules.index(position)
+            del data.capsules[index]
+            data._capsuleEaten = position
+            eatenCapsule = (index, position)
+            for ghostIndex in range(1, len(data.agentStates)):
+                ghostState = data.agentStates[ghostIndex]
+                changed.append((ghostIndex, ghostState.configuration, ghostState.scaredTimer))
+                ghostState.scaredTimer = SCARED_TIME
+        return eatenFood, eatenCapsule
+
+    def undo(self, record):
+        "Restores the state from before the apply call that returned record."
+        (agentIndex, changed, score, scoreChange, win, lose, eaten, foodEaten, capsuleEaten,
+         agentMoved, zobrist, eatenFood, eatenCapsule) = record
+        data = self.data
+        agentStates = data.agentStates
+        # the earliest entry of an agent holds its original values
+        for index, configuration, scaredTimer in reversed(changed):
+            agentStates[index].configuration = configuration
+            agentStates[index].scaredTimer = scaredTimer
+        if eatenFood != None:
+            x, y = eatenFood
+            data.food[x][y] = True
+            self.numFood += 1
+        if eatenCapsule != None:
+            data.capsules.insert(*eatenCapsule)
+        data.score, data.scoreChange = score, scoreChange
+        data._win, data._lose = win, lose
+        data._eaten, data._foodEaten, data._capsuleEaten, data._agentMoved = eaten, foodEaten, capsuleEaten, agentMoved
+        data.zobrist = zobrist
+
+    def generateSuccessor(self, agentIndex, action):
+        if self.isWin() or self.isLose():
+            raise Exception('Can\'t generate a successor of a terminal state.')
+        state = GameState(self)
+        state.data.food = self.data.food.copy()
+        state.data.capsules = self.data.capsules[:]
+        state.data.agentStates = state.data.copyAgentStates(self.data.agentStates)
+        state.data._ownedAgents = -1
+        return GameState.generateSuccessor(state, agentIndex, action)
+
+
 ############################################################################
 #                     THE HIDDEN SECRETS OF PACMAN                         #
 #                                                                          #
@@ -359,7 +531,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.getWritableAgentState(0)
 
         # Update Configuration
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -389,11 +561,11 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if(position in state.getCapsules()):
-            state.data.capsules.remove(position)
+            state.data.capsules = [capsule for capsule in state.data.capsules if capsule != position]
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.getWritableAgentState(index).scaredTimer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -425,7 +597,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.getWritableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0:
             speed /= 2.0
@@ -437,8 +609,9 @@ class GhostRules:
     def decrementTimer(ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint(
-                ghostState.configuration.pos)
+            # configurations are shared between states, so replace it
+            ghostState.configuration = Configuration(
+                nearestPoint(ghostState.configuration.pos), ghostState.configuration.direction)
         ghostState.scaredTimer = max(0, timer - 1)
     decrementTimer = staticmethod(decrementTimer)
 
@@ -460,9 +633,11 @@ class GhostRules:
     def collide(state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
             state.data.scoreChange += 200
+            ghostState = state.data.getWritableAgentState(agentIndex)
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -22,6 +22,19 @@ Example:
 distancer = Distancer(gameState.data.layout)
 distancer.getDistance( (1,1), (10,10) )
 
+The distances themselves live in a DistanceOracle, one per wall layout,
+which any agent or heuristic can query directly in constant time:
+
+oracle = getDistanceOracle(gameState.data.layout)
+oracle.distance( (1,1), (10,10) )
+
+Distance tables are also written to an on-disk cache (DISTANCE_CACHE_DIR,
+overridable with the PACMAN_DISTANCE_CACHE environment variable), keyed by
+a hash of the wall grid.  Later processes memory-map the table instead of
+recomputing it, so every process playing on a layout shares the same pages
+and a Distancer built on a cached layout never falls back to Manhattan
+distances.
+
 The Distancer object also serves as an example of sharing data
 safely among agents via a global dictionary (distanceMap),
 and performing asynchronous computation via threads. These
@@ -31,6 +44,8 @@ distances.
 """
 
 import threading, sys, time, random
+import hashlib, mmap, os, tempfile
+from array import array
 
 class Distancer:
   def __init__(self, layout, background=True, default=10000):
@@ -45,6 +60,12 @@ class Distancer:
     self._distances = None
     self.default = default
 
+    # Use the distances right away if another agent or process already
+    # computed them for this layout
+    self._distances = getCachedDistanceOracle(layout)
+    if self._distances != None:
+      return
+
     # Start computing distances in the background; when the dc finishes,
     # it will fill in self._distances for us.
     dc = DistanceCalculator()
@@ -75,11 +96,10 @@ class Distancer:
     return bestDistance
 
   def getDistanceOnGrid(self, pos1, pos2):
-    key = (pos1, pos2)
-    if key in self._distances:
-      return self._distances[key]
-    else:
-      raise Exception("Positions not in grid: " + str(key))
+    try:
+      return self._distances.distance(pos1, pos2)
+    except KeyError:
+      raise Exception("Positions not in grid: " + str((pos1, pos2)))
 
   def isReadyForMazeDistance(self):
     return self._distances != None
@@ -132,6 +152,7 @@ class DistanceCalculator(threading.Thread):
       distanceThread = self
 
       distances = computeDistances(self.layout)
+      saveDistanceOracle(self.layout, distances)
       print('[Distancer]: Switching to maze distances',file=sys.stdout)
 
       distanceMap[self.layout.walls] = distances
@@ -143,49 +164,158 @@ class DistanceCalculator(threading.Thread):
     self.distancer._distances = distances
 
 def computeDistances(layout):
-    distances = {}
-    allNodes = layout.walls.asList(False)
-    for source in allNodes:
-        dist = {}
-        closed = {}
-        for node in allNodes:
-            dist[node] = 1000000000
-        import util
-        queue = util.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
-                continue
-            closed[node] = True
-            nodeDist = dist[node]
-            adjacent = []
-            x, y = node
-            if not layout.isWall((x,y+1)):
-                adjacent.append((x,y+1))
-            if not layout.isWall((x,y-1)):
-                adjacent.append((x,y-1) )
-            if not layout.isWall((x+1,y)):
-                adjacent.append((x+1,y) )
-            if not layout.isWall((x-1,y)):
-                adjacent.append((x-1,y))
-            for other in adjacent:
-                if not other in dist:
-                    continue
-                oldDist = dist[other]
-                newDist = nodeDist+1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
-    return distances
+    return DistanceOracle(layout.walls)
 
 
 def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-      return distances[key]
-    return 100000
+    try:
+      return distances.distance(pos1, pos2)
+    except KeyError:
+      return 100000
+
+def getDistanceOracle(layout):
+  """
+  Returns the DistanceOracle shared by every layout with the same walls,
+  building it on first use.  layout may be a Layout or its wall Grid, which
+  share one oracle; a Layout also remembers the oracle so later calls skip
+  hashing the walls.
+  """
+  oracle = getCachedDistanceOracle(layout)
+  if oracle is None:
+    walls = getattr(layout, 'walls', layout)
+    oracle = DistanceOracle(walls)
+    saveDistanceOracle(layout, oracle)
+    distanceMapSemaphore.acquire()
+    distanceMap[walls] = oracle
+    distanceMapSemaphore.release()
+    if walls is not layout:
+      layout.distanceOracle = oracle
+  return oracle
+
+def getCachedDistanceOracle(layout):
+  """
+  Returns the DistanceOracle for a layout if it is already in memory or in
+  the on-disk cache, and None otherwise.  Never computes distances.
+  """
+  oracle = getattr(layout, 'distanceOracle', None)
+  if oracle is None:
+    walls = getattr(layout, 'walls', layout)
+    distanceMapSemaphore.acquire()
+    if walls not in distanceMap:
+      oracle = loadDistanceOracle(layout)
+      if oracle != None:
+        distanceMap[walls] = oracle
+    oracle = distanceMap.get(walls)
+    distanceMapSemaphore.release()
+    if oracle != None and walls is not layout:
+      layout.distanceOracle = oracle
+  return oracle
+
+DISTANCE_CACHE_DIR = os.environ.get('PACMAN_DISTANCE_CACHE',
+                                    os.path.join(tempfile.gettempdir(), 'pacman-distances'))
+
+def distanceCachePath(layout):
+  """
+  The cache file of a layout (or of its wall Grid), named by a hash of the
+  walls, so layouts differing only in food or agents share one file.
+  """
+  text = str(getattr(layout, 'walls', layout))
+  key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+  return os.path.join(DISTANCE_CACHE_DIR, '%s-%d.dist' % (key, array('i').itemsize))
+
+def loadDistanceOracle(layout):
+  """
+  Memory-maps the cached distance table of a layout.  Returns None if there
+  is no usable cache file.
+  """
+  walls = getattr(layout, 'walls', layout)
+  size = walls.count(False)
+  try:
+    with open(distanceCachePath(layout), 'rb') as f:
+      if os.fstat(f.fileno()).st_size != size * size * array('i').itemsize:
+        return None
+      # the mapping stays valid after the file is closed
+      table = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('i')
+  except (OSError, ValueError):
+    return None
+  return DistanceOracle(walls, table)
+
+def saveDistanceOracle(layout, oracle):
+  """
+  Writes a distance table to the on-disk cache.  The file is renamed into
+  place once complete, so concurrent readers never see a partial table.
+  Failing to write the cache is not an error.
+  """
+  path = distanceCachePath(layout)
+  if os.path.exists(path):
+    return
+  tmpPath = None
+  try:
+    os.makedirs(DISTANCE_CACHE_DIR, exist_ok=True)
+    fd, tmpPath = tempfile.mkstemp(dir=DISTANCE_CACHE_DIR)
+    with os.fdopen(fd, 'wb') as f:
+      f.write(oracle.table.tobytes())
+    os.chmod(tmpPath, 0o644)
+    os.replace(tmpPath, path)
+  except OSError:
+    # do not leave partial tables behind
+    if tmpPath != None and os.path.exists(tmpPath):
+      try:
+        os.remove(tmpPath)
+      except OSError:
+        pass
+
+UNREACHABLE = 1000000000
+
+class DistanceOracle:
+  """
+  All-pairs maze distances for one wall Grid.
+
+  Open cells are numbered in the order of walls.asList(False) and the
+  distances are kept in one flat array, so distance(p, q) is a dict lookup
+  for each cell plus one array read.  The table is filled by a breadth-first
+  sweep from every cell over precomputed neighbor lists, one whole layer of
+  the frontier at a time.
+
+  table may be an existing distance table for the same walls, such as one
+  memory-mapped from the on-disk cache.
+  """
+  def __init__(self, walls, table=None):
+    self.cells = walls.asList(False)
+    self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+    self.size = size = len(self.cells)
+    if table is not None:
+      self.table = table
+      return
+
+    neighbors = []
+    for x, y in self.cells:
+      adjacent = [(x, y+1), (x, y-1), (x+1, y), (x-1, y)]
+      neighbors.append([self.cellIndex[other] for other in adjacent if other in self.cellIndex])
+
+    table = array('i', [UNREACHABLE]) * (size * size)
+    for source in range(size):
+      row = source * size
+      table[row + source] = 0
+      frontier = [source]
+      distance = 0
+      while frontier:
+        distance += 1
+        layer = []
+        for cell in frontier:
+          for other in neighbors[cell]:
+            if table[row + other] == UNREACHABLE:
+              table[row + other] = distance
+              layer.append(other)
+        frontier = layer
+    self.table = table
+
+  def distance(self, pos1, pos2):
+    """
+    The maze distance between two open cells, or UNREACHABLE if they are not
+    connected.  Raises KeyError if either position is a wall or off the grid.
+    """
+    return self.table[self.cellIndex[pos1] * self.size + self.cellIndex[pos2]]
 
+  def isReachable(self, pos1, pos2):
+    return self.distance(pos1, pos2) != UNREACHABLE
@@ -0,0 +1,321 @@
+# distanceCalculator.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+# 
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+This file contains a Distancer object which computes and
+caches the shortest path between any two points in the maze. It
+returns a Manhattan distance between two points if the maze distance
+has not yet been calculated.
+
+Example:
+distancer = Distancer(gameState.data.layout)
+distancer.getDistance( (1,1), (10,10) )
+
+The distances themselves live in a DistanceOracle, one per wall layout,
+which any agent or heuristic can query directly in constant time:
+
+oracle = getDistanceOracle(gameState.data.layout)
+oracle.distance( (1,1), (10,10) )
+
+Distance tables are also written to an on-disk cache (DISTANCE_CACHE_DIR,
+overridable with the PACMAN_DISTANCE_CACHE environment variable), keyed by
+a hash of the wall grid.  Later processes memory-map the table instead of
+recomputing it, so every process playing on a layout shares the same pages
+and a Distancer built on a cached layout never falls back to Manhattan
+distances.
+
+The Distancer object also serves as an example of sharing data
+safely among agents via a global dictionary (distanceMap),
+and performing asynchronous computation via threads. These
+examples may help you in designing your own objects, but you
+shouldn't need to modify the Distancer code in order to use its
+distances.
+"""
+
+import threading, sys, time, random
+import hashlib, mmap, os, tempfile
+from array import array
+
+class Distancer:
+  def __init__(self, layout, background=True, default=10000):
+    """
+    Initialize with Distancer(layout).  Changing default is unnecessary.
+
+    This will start computing maze distances in the background and use them
+    as soon as they are ready.  In the meantime, it returns manhattan distance.
+
+    To compute all maze distances on initialization, set background=False
+    """
+    self._distances = None
+    self.default = default
+
+    # Use the distances right away if another agent or process already
+    # computed them for this layout
+    self._distances = getCachedDistanceOracle(layout)
+    if self._distances != None:
+      return
+
+    # Start computing distances in the background; when the dc finishes,
+    # it will fill in self._distances for us.
+    dc = DistanceCalculator()
+    dc.setAttr(layout, self)
+    dc.setDaemon(True)
+    if background:
+      dc.start()
+    else:
+      dc.run()
+
+  def getDistance(self, pos1, pos2):
+    """
+    The getDistance function is the only one you'll need after you create the object.
+    """
+    if self._distances == None:
+      return manhattanDistance(pos1, pos2)
+    if isInt(pos1) and isInt(pos2):
+      return self.getDistanceOnGrid(pos1, pos2)
+    pos1Grids = getGrids2D(pos1)
+    pos2Grids = getGrids2D(pos2)
+    bestDistance = self.default
+    for pos1Snap, snap1Distance in pos1Grids:
+      for pos2Snap, snap2Distance in pos2Grids:
+        gridDistance = self.getDistanceOnGrid(pos1Snap, pos2Snap)
+        distance = gridDistance + snap1Distance + snap2Distance
+        if bestDistance > distance:
+          bestDistance = distance
+    return bestDistance
+
+  def getDistanceOnGrid(self, pos1, pos2):
+    try:
+      return self._distances.distance(pos1, pos2)
+    except KeyError:
+      raise Exception("Positions not in grid: " + str((pos1, pos2)))
+
+  def isReadyForMazeDistance(self):
+    return self._distances != None
+
+def manhattanDistance(x, y ):
+  return abs( x[0] - y[0] ) + abs( x[1] - y[1] )
+
+def isInt(pos):
+  x, y = pos
+  return x == int(x) and y == int(y)
+
+def getGrids2D(pos):
+  grids = []
+  for x, xDistance in getGrids1D(pos[0]):
+    for y, yDistance in getGrids1D(pos[1]):
+      grids.append(((x, y), xDistance + yDistance))
+  return grids
+
+def getGrids1D(x):
+  intX = int(x)
+  if x == int(x):
+    return [(x, 0)]
+  return [(intX, x-intX), (intX+1, intX+1-x)]
+
+##########################################
+# MACHINERY FOR COMPUTING MAZE DISTANCES #
+##########################################
+
+distanceMap = {}
+distanceMapSemaphore = threading.Semaphore(1)
+distanceThread = None
+
+def waitOnDistanceCalculator(t):
+  global distanceThread
+  if distanceThread != None:
+    time.sleep(t)
+
+class DistanceCalculator(threading.Thread):
+  def setAttr(self, layout, distancer, default = 10000):
+    self.layout = layout
+    self.distancer = distancer
+    self.default = default
+
+  def run(self):
+    global distanceMap, distanceThread
+    distanceMapSemaphore.acquire()
+
+    if self.layout.walls not in distanceMap:
+      if distanceThread != None: raise Exception('Multiple distance threads')
+      distanceThread = self
+
+      distances = computeDistances(self.layout)
+      saveDistanceOracle(self.layout, distances)
+      print('[Distancer]: Switching to maze distances',file=sys.stdout)
+
+      distanceMap[self.layout.walls] = distances
+      distanceThread = None
+    else:
+      distances = distanceMap[self.layout.walls]
+
+    distanceMapSemaphore.release()
+    self.distancer._distances = distances
+
+def computeDistances(layout):
+    return DistanceOracle(layout.walls)
+
+
+def getDistanceOnGrid(distances, pos1, pos2):
+    try:
+      return distances.distance(pos1, pos2)
+    except KeyError:
+      return 100000
+
+def getDistanceOracle(layout):
+  """
+  Returns the DistanceOracle shared by every layout with the same walls,
+  building it on first use.  layout may be a Layout or its wall Grid, which
+  share one oracle; a Layout also remembers the oracle so later calls skip
+  hashing the walls.
+  """
+  oracle = getCachedDistanceOracle(layout)
+  if oracle is None:
+    walls = getattr(layout, 'walls', layout)
+    oracle = DistanceOracle(walls)
+    saveDistanceOracle(layout, oracle)
+    distanceMapSemaphore.acquire()
+    distanceMap[walls] = oracle
+    distanceMapSemaphore.release()
+    if walls is not layout:
+      layout.distanceOracle = oracle
+  return oracle
+
+def getCachedDistanceOracle(layout):
+  """
+  Returns the DistanceOracle for a layout if it is already in memory or in
+  the on-disk cache, and None otherwise.  Never computes distances.
+  """
+  oracle = getattr(layout, 'distanceOracle', None)
+  if oracle is None:
+    walls = getattr(layout, 'walls', layout)
+    distanceMapSemaphore.acquire()
+    if walls not in distanceMap:
+      oracle = loadDistanceOracle(layout)
+      if oracle != None:
+        distanceMap[walls] = oracle
+    oracle = distanceMap.get(walls)
+    distanceMapSemaphore.release()
+    if oracle != None and walls is not layout:
+      layout.distanceOracle = oracle
+  return oracle
+
+DISTANCE_CACHE_DIR = os.environ.get('PACMAN_DISTANCE_CACHE',
+                                    os.path.join(tempfile.gettempdir(), 'pacman-distances'))
+
+def distanceCachePath(layout):
+  """
+  The cache file of a layout (or of its wall Grid), named by a hash of the
+  walls, so layouts differing only in food or agents share one file.
+  """
+  text = str(getattr(layout, 'walls', layout))
+  key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+  return os.path.join(DISTANCE_CACHE_DIR, '%s-%d.dist' % (key, array('i').itemsize))
+
+def loadDistanceOracle(layout):
+  """
+  Memory-maps the cached distance table of a layout.  Returns None if there
+  is no usable cache file.
+  """
+  walls = getattr(layout, 'walls', layout)
+  size = walls.count(False)
+  try:
+    with open(distanceCachePath(layout), 'rb') as f:
+      if os.fstat(f.fileno()).st_size != size * size * array('i').itemsize:
+        return None
+      # the mapping stays valid after the file is closed
+      table = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('i')
+  except (OSError, ValueError):
+    return None
+  return DistanceOracle(walls, table)
+
+def saveDistanceOracle(layout, oracle):
+  """
+  Writes a distance table to the on-disk cache.  The file is renamed into
+  place once complete, so concurrent readers never see a partial table.
+  Failing to write the cache is not an error.
+  """
+  path = distanceCachePath(layout)
+  if os.path.exists(path):
+    return
+  tmpPath = None
+  try:
+    os.makedirs(DISTANCE_CACHE_DIR, exist_ok=True)
+    fd, tmpPath = tempfile.mkstemp(dir=DISTANCE_CACHE_DIR)
+    with os.fdopen(fd, 'wb') as f:
+      f.write(oracle.table.tobytes())
+    os.chmod(tmpPath, 0o644)
+    os.replace(tmpPath, path)
+  except OSError:
+    # do not leave partial tables behind
+    if tmpPath != None and os.path.exists(tmpPath):
+      try:
+        os.remove(tmpPath)
+      except OSError:
+        pass
+
+UNREACHABLE = 1000000000
+
+class DistanceOracle:
+  """
+  All-pairs maze distances for one wall Grid.
+
+  Open cells are numbered in the order of walls.asList(False) and the
+  distances are kept in one flat array, so distance(p, q) is a dict lookup
+  for each cell plus one array read.  The table is filled by a breadth-first
+  sweep from every cell over precomputed neighbor lists, one whole layer of
+  the frontier at a time.
+
+  table may be an existing distance table for the same walls, such as one
+  memory-mapped from the on-disk cache.
+  """
+  def __init__(self, walls, table=None):
+    self.cells = walls.asList(False)
+    self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+    self.size = size = len(self.cells)
+    if table is not None:
+      self.table = table
+      return
+
+    neighbors = []
+    for x, y in self.cells:
+      adjacent = [(x, y+1), (x, y-1), (x+1, y), (x-1, y)]
+      neighbors.append([self.cellIndex[other] for other in adjacent if other in self.cellIndex])
+
+    table = array('i', [UNREACHABLE]) * (size * size)
+    for source in range(size):
+      row = source * size
+      table[row + source] = 0
+      frontier = [source]
+      distance = 0
+      while frontier:
+        distance += 1
+        layer = []
+        for cell in frontier:
+          for other in neighbors[cell]:
+            if table[row + other] == UNREACHABLE:
+              table[row + other] = distance
+              layer.append(other)
+        frontier = layer
+    self.table = table
+
+  def distance(self, pos1, pos2):
+    """
+    The maze distance between two open cells, or UNREACHABLE if they are not
+    connected.  Raises KeyError if either position is a wall or off the grid.
+    """
+    return self.table[self.cellIndex[pos1] * self.size + self.cellIndex[pos2]]
+
+  def isReachable(self, pos1, pos2):
+    return self.distance(pos1, pos2) != UNREACHABLE
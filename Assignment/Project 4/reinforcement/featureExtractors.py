@@ -15,6 +15,7 @@
 "Feature extractors for Pacman game states"
 
 from game import Directions, Actions
+from distanceCalculator import getDistanceOracle, UNREACHABLE
 import util
 
 class FeatureExtractor:
@@ -41,27 +42,19 @@ class CoordinateExtractor(FeatureExtractor):
         feats['action=%s' % action] = 1.0
         return feats
 
-def closestFood(pos, food, walls):
+def closestFood(pos, food, layout):
     """
     closestFood -- this is similar to the function that we have
-    worked on in the search project; here its all in one place
+    worked on in the search project; here it reads the maze distances
+    from the layout's shared distance oracle instead of searching
     """
-    fringe = [(pos[0], pos[1], 0)]
-    expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
-        if (pos_x, pos_y) in expanded:
-            continue
-        expanded.add((pos_x, pos_y))
-        # if we find a food at this location then exit
-        if food[pos_x][pos_y]:
-            return dist
-        # otherwise spread out from the location to its neighbours
-        nbrs = Actions.getLegalNeighbors((pos_x, pos_y), walls)
-        for nbr_x, nbr_y in nbrs:
-            fringe.append((nbr_x, nbr_y, dist+1))
-    # no food found
-    return None
+    distances = getDistanceOracle(layout)
+    dists = [distances.distance(pos, f) for f in food.asList()]
+    dists = [d for d in dists if d != UNREACHABLE]
+    if not dists:
+        # no food found
+        return None
+    return min(dists)
 
 class SimpleExtractor(FeatureExtractor):
     """
@@ -94,7 +87,7 @@ class SimpleExtractor(FeatureExtractor):
         if not features["#-of-ghosts-1-step-away"] and food[next_x][next_y]:
             features["eats-food"] = 1.0
 
-        dist = closestFood((next_x, next_y), food, walls)
+        dist = closestFood((next_x, next_y), food, state.data.layout)
         if dist is not None:
             # make the distance a number less than one otherwise the update
             # will diverge wildly